@@ -0,0 +1,105 @@
+"""
+ANN index recall and latency benchmark.
+
+Run from backend/:
+    python benchmarks/bench_ann.py                    # current catalog
+    python benchmarks/bench_ann.py --rows 100000      # synthetic catalog of 100k rows
+
+Builds the IVF index in a temporary directory and compares it against
+brute-force cosine scoring:
+- candidate recall: share of the exact top-10 rows found in the M ANN candidates
+- end-to-end agreement: share of main()'s top-K kept when scoring runs over
+  the ANN candidates only (current catalog only; synthetic rows have no metadata)
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from chatbot.activity_catalog import get_catalog
+from chatbot.ann_index import ANN_CANDIDATES, ANN_NPROBE, build_ann_index, load_ann_index
+from chatbot.catalog_bundle import l2_normalize
+from chatbot.embedding_cache import embedding_cache
+from chatbot.recommendation_model import MODEL, MODEL_NAME, main as rec_main
+from bench_recommendation import PROFILES
+
+
+def synthetic_vectors(base, rows, noise=0.05, seed=0):
+    """`rows` vectors scattered around the real catalog vectors."""
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(base), size=rows)
+    return l2_normalize(base[picks] + rng.normal(0, noise, size=(rows, base.shape[1])).astype(np.float32))
+
+
+def query_vectors(catalog_vectors, count, seed=1):
+    """Profile interest vectors plus perturbed catalog vectors as queries."""
+    queries = [embedding_cache.encode(MODEL, MODEL_NAME, p[0]).mean(axis=0) for p in PROFILES]
+    rng = np.random.default_rng(seed)
+    picks = rng.integers(0, len(catalog_vectors), size=max(0, count - len(queries)))
+    queries.extend(catalog_vectors[picks] + rng.normal(0, 0.1, size=(len(picks), catalog_vectors.shape[1])))
+    return l2_normalize(np.array(queries))
+
+
+def candidate_recall(index, vectors, queries, m, nprobe, k=10):
+    recalls, ann_ms, exact_ms = [], [], []
+    for q in queries:
+        start = time.perf_counter()
+        exact = np.argpartition(-(vectors @ q), k - 1)[:k]
+        exact_ms.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        candidates = index.search(q, m, nprobe)
+        ann_ms.append((time.perf_counter() - start) * 1000)
+        recalls.append(np.isin(exact, candidates).mean())
+    return np.mean(recalls), np.percentile(ann_ms, 50), np.percentile(exact_ms, 50)
+
+
+def end_to_end_agreement(catalog, index, top_k):
+    snapshot = catalog.snapshot
+    exact = [rec_main(*p, catalog=catalog, top_k=top_k)['title'].tolist() for p in PROFILES]
+    snapshot.ann_index = index
+    try:
+        approx = [rec_main(*p, catalog=catalog, top_k=top_k)['title'].tolist() for p in PROFILES]
+    finally:
+        snapshot.ann_index = None
+    kept = [len(set(a) & set(e)) / max(1, len(e)) for a, e in zip(approx, exact)]
+    return np.mean(kept)
+
+
+def run(rows, m, nprobe, queries, top_k):
+    catalog = get_catalog()
+    if not catalog.load():
+        print("Activity catalog could not be loaded")
+        return 1
+    catalog_vectors = np.asarray(catalog.snapshot.vectors)
+    vectors = synthetic_vectors(catalog_vectors, rows) if rows else catalog_vectors
+    print(f"Vectors: {len(vectors)} x {vectors.shape[1]} ({'synthetic' if rows else 'catalog'}), M={m}, nprobe={nprobe}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        info = build_ann_index(vectors, tmp)
+        print(f"Build: {info['nlist']} lists in {time.perf_counter() - start:.1f}s")
+        index = load_ann_index(vectors, tmp)
+
+    recall, ann_p50, exact_p50 = candidate_recall(index, vectors, query_vectors(catalog_vectors, queries), m, nprobe)
+    print(f"Candidate recall@10 in top-{m}: {recall:.3f}")
+    print(f"Search p50: ANN {ann_p50:.2f} ms, brute force {exact_p50:.2f} ms")
+
+    if not rows:
+        agreement = end_to_end_agreement(catalog, index, top_k)
+        print(f"End-to-end top-{top_k} agreement with exact scoring: {agreement:.3f}")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=0, help="synthetic catalog size (0 = current catalog)")
+    parser.add_argument("--m", type=int, default=ANN_CANDIDATES, help="ANN candidates per query")
+    parser.add_argument("--nprobe", type=int, default=ANN_NPROBE, help="inverted lists scanned per query")
+    parser.add_argument("--queries", type=int, default=200, help="queries to evaluate")
+    parser.add_argument("--top-k", type=int, default=3, help="results per recommendation")
+    args = parser.parse_args()
+    sys.exit(run(args.rows, args.m, args.nprobe, args.queries, args.top_k))
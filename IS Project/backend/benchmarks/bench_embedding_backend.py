@@ -0,0 +1,122 @@
+"""
+Embedding backend parity and performance benchmark.
+
+Run from backend/ after data/export_onnx.py:
+    python benchmarks/bench_embedding_backend.py --backends torch onnx onnx-int8
+
+Parity: every ONNX backend must reach cosine >= --min-cosine (0.99) against
+the torch embeddings on every text (catalog titles, interest vocabulary and
+chat-style queries); exits 1 otherwise.
+
+Performance: each backend runs in a fresh process, so the report shows its
+real cold start (import + model load), peak RSS, and encode latency for
+single queries and catalog-sized batches.
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+import numpy as np
+
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, BACKEND_DIR)
+from chatbot.embedding_runtime import DEFAULT_MODEL_NAME, EmbeddingRuntime
+from chatbot.interest_vocab import INTEREST_VOCABULARY
+
+QUERIES = [
+    "recommend some exercises", "i want to do tai chi in the morning", "what is normal blood pressure",
+    "any free cooking classes near ang mo kio", "hello", "suggest activities for seniors who like music",
+]
+
+# Runs in a child process with EMBEDDING_BACKEND set; prints one JSON line
+PROBE = r"""
+import json, resource, sys, time
+start = time.perf_counter()
+sys.path.insert(0, {backend_dir!r})
+from chatbot.embedding_runtime import EmbeddingRuntime
+runtime = EmbeddingRuntime({model!r}, micro_batching=False)
+runtime.load()
+cold = time.perf_counter() - start
+texts = json.loads(sys.stdin.read())
+runtime.encode(texts[:8])  # warm-up
+single = []
+for text in texts[:{queries}]:
+    t = time.perf_counter(); runtime.encode([text]); single.append((time.perf_counter() - t) * 1000)
+t = time.perf_counter(); runtime.encode(texts, batch_size=64); batch = (time.perf_counter() - t) * 1000
+single.sort()
+try:  # VmHWM is per process image; ru_maxrss would include the parent's peak inherited through fork
+    rss = int([l for l in open("/proc/self/status") if l.startswith("VmHWM")][0].split()[1]) / 1024
+except OSError:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+print(json.dumps({{"backend": runtime.backend, "cold_start_s": cold, "rss_mb": rss,
+                  "single_p50_ms": single[len(single) // 2], "batch_ms": batch, "batch_size": len(texts)}}))
+"""
+
+
+def sample_texts(limit):
+    texts = list(QUERIES) + list(INTEREST_VOCABULARY)
+    try:
+        from chatbot.activity_catalog import get_catalog
+
+        catalog = get_catalog()
+        if catalog.load():
+            texts += [t for t in catalog.snapshot.titles[:limit] if isinstance(t, str)]
+    except Exception as e:
+        print(f"Catalog titles unavailable ({e}); using vocabulary only")
+    return texts[:limit]
+
+
+def parity(model_name, backends, texts, min_cosine):
+    reference = EmbeddingRuntime(model_name, micro_batching=False, backend="torch").encode(texts)
+    reference /= np.linalg.norm(reference, axis=1, keepdims=True)
+    ok = True
+    for backend in backends:
+        if backend == "torch":
+            continue
+        runtime = EmbeddingRuntime(model_name, micro_batching=False, backend=backend)
+        vectors = runtime.encode(texts)
+        if runtime.backend != backend:
+            print(f"{backend}: not available (fell back to {runtime.backend})")
+            ok = False
+            continue
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        cosine = (vectors * reference).sum(axis=1)
+        worst = int(np.argmin(cosine))
+        passed = cosine.min() >= min_cosine
+        ok &= passed
+        print(f"{backend}: cosine vs torch min {cosine.min():.4f}, mean {cosine.mean():.4f} "
+              f"({'OK' if passed else 'FAIL'}; worst: {texts[worst][:40]!r})")
+    return ok
+
+
+def performance(model_name, backends, texts, queries):
+    for backend in backends:
+        probe = PROBE.format(backend_dir=BACKEND_DIR, model=model_name, queries=queries)
+        env = dict(os.environ, EMBEDDING_BACKEND=backend)
+        result = subprocess.run([sys.executable, "-c", probe], input=json.dumps(texts), env=env,
+                                capture_output=True, text=True)
+        lines = [l for l in result.stdout.splitlines() if l.startswith("{")]
+        if result.returncode != 0 or not lines:
+            print(f"{backend}: probe failed\n{result.stderr[-500:]}")
+            continue
+        r = json.loads(lines[-1])
+        print(f"{backend:>10}: cold start {r['cold_start_s']:.2f}s, peak RSS {r['rss_mb']:.0f} MB, "
+              f"single query p50 {r['single_p50_ms']:.2f} ms, batch of {r['batch_size']} {r['batch_ms']:.0f} ms"
+              + (f" (ran as {r['backend']})" if r['backend'] != backend else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME, help="SentenceTransformer model name")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx", "onnx-int8"])
+    parser.add_argument("--texts", type=int, default=512, help="texts for parity and the batch timing")
+    parser.add_argument("--queries", type=int, default=50, help="single-text encodes to time")
+    parser.add_argument("--min-cosine", type=float, default=0.99, help="parity threshold")
+    args = parser.parse_args()
+
+    texts = sample_texts(args.texts)
+    print(f"Model {args.model}, {len(texts)} texts")
+    passed = parity(args.model, args.backends, texts, args.min_cosine)
+    performance(args.model, args.backends, texts, args.queries)
+    sys.exit(0 if passed else 1)
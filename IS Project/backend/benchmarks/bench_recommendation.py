@@ -0,0 +1,103 @@
+"""
+Recommendation latency benchmark and regression guard.
+
+Run from backend/:
+    python benchmarks/bench_recommendation.py --runs 20
+
+Times recommendation_model.main() against the resident activity catalog and
+fails (exit code 1) if the per-request path iterates DataFrame rows beyond the
+K results, i.e. if per-request work stops being restricted to precomputed
+catalog columns.
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from chatbot.activity_catalog import get_catalog
+from chatbot.recommendation_model import main as rec_main
+
+# (interests, languages, time_slots, budget, need_free, lat, lon, sourcetypes)
+PROFILES = [
+    (["tai chi", "yoga"], ["English"], ["morning"], 50, True, 1.3795, 103.8549, None),
+    (["cooking"], ["Chinese"], [], None, False, 1.4144, 103.8779, None),
+    (["art", "music"], [], ["evening"], 20, False, 0.0, 0.0, None),
+    (["dance"], ["English", "Malay"], ["afternoon"], 100, False, 1.3287, 103.8832, ["course", "event"]),
+    (["hiking", "swimming", "fitness"], ["English"], ["morning", "evening"], 30, True, 1.3567, 103.6984, None),
+]
+
+
+class RowIterationGuard:
+    """
+    Record DataFrame.iterrows / itertuples calls made while active that walk
+    more than `max_rows` rows. Iterating the K output rows is fine; iterating
+    the candidate set is the regression this guards against.
+    """
+
+    PATCHED = ("iterrows", "itertuples")
+
+    def __init__(self, max_rows: int):
+        self.max_rows = max_rows
+        self.violations = []
+        self._originals = {}
+
+    def __enter__(self):
+        for name in self.PATCHED:
+            original = getattr(pd.DataFrame, name)
+            self._originals[name] = original
+
+            def counted(df, *args, _original=original, _name=name, **kwargs):
+                if len(df) > self.max_rows:
+                    self.violations.append((_name, len(df)))
+                return _original(df, *args, **kwargs)
+
+            setattr(pd.DataFrame, name, counted)
+        return self
+
+    def __exit__(self, *exc):
+        for name, original in self._originals.items():
+            setattr(pd.DataFrame, name, original)
+
+
+def run(runs: int, top_k: int):
+    catalog = get_catalog()
+    if not catalog.load():
+        print("Activity catalog could not be loaded")
+        return 1
+    print(f"Catalog: {len(catalog.df)} activities from {catalog.snapshot.source}")
+
+    # Warm-up (model, caches)
+    for profile in PROFILES:
+        rec_main(*profile, catalog=catalog)
+
+    timings = []
+    with RowIterationGuard(max_rows=top_k) as guard:
+        for _ in range(runs):
+            for profile in PROFILES:
+                start = time.perf_counter()
+                rec_main(*profile, catalog=catalog, top_k=top_k)
+                timings.append((time.perf_counter() - start) * 1000)
+
+    timings = np.array(timings)
+    print(f"main(): {len(timings)} calls, "
+          f"p50 {np.percentile(timings, 50):.1f} ms, "
+          f"p95 {np.percentile(timings, 95):.1f} ms, "
+          f"max {timings.max():.1f} ms")
+    if guard.violations:
+        name, rows = max(guard.violations, key=lambda v: v[1])
+        print(f"REGRESSION: per-request path iterated DataFrame rows {len(guard.violations)} times "
+              f"(largest: {name} over {rows} rows)")
+        return 1
+    print("OK: no DataFrame row iteration on the per-request path")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="repetitions of the profile set")
+    parser.add_argument("--top-k", type=int, default=3, help="results per recommendation")
+    args = parser.parse_args()
+    sys.exit(run(args.runs, args.top_k))
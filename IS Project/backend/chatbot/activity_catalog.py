@@ -0,0 +1,270 @@
+import hashlib
+import os
+import threading
+import time
+from typing import Optional
+import numpy as np
+import pandas as pd
+from chatbot.catalog_bundle import BUNDLE_DIR, bundle_exists, bundle_paths, l2_normalize, load_bundle
+from chatbot.geo import SpatialIndex, to_radians
+from chatbot.bitmask import BitmaskIndex
+from chatbot.token_index import InvertedIndex
+from chatbot.interest_vocab import load_interest_vocab
+from chatbot.ann_index import ANN_MIN_ROWS, load_ann_index
+
+BASE_DIR = os.path.dirname(__file__)
+DATA_DIR = os.path.join(BASE_DIR, '..', 'data')
+ACTIVITIES_PATH = os.path.join(DATA_DIR, 'activities.xlsx')
+VECTORS_PATH = os.path.join(DATA_DIR, 'activities_with_vec.pkl')
+
+VECTOR_DIM = 384  # all-MiniLM-L6-v2
+POLL_INTERVAL = float(os.getenv("CATALOG_POLL_SECONDS", "30"))
+LANGUAGE_SPLIT = r'[,/;| ]+'  # e.g. "ENGLISH,CHINESE"
+
+
+# -----------------------------
+# Catalog loading
+# -----------------------------
+def load_catalog_frame(activities_path=ACTIVITIES_PATH, vectors_path=VECTORS_PATH):
+    """
+    Legacy format: read activities.xlsx and join the pickled activity vectors on id.
+    Returns the activity table and an L2-normalized float32 [N, dim] matrix aligned with its rows.
+    """
+    df = pd.read_excel(activities_path)
+    df_with_vec = pd.read_pickle(vectors_path)
+
+    df = df.merge(
+        df_with_vec[['id', 'activity_vector']],
+        on='id',
+        how='left'
+    )
+    missing = int(df['activity_vector'].isna().sum())
+    if missing:
+        raise ValueError(f"{missing} of {len(df)} activities have no vector "
+                         f"(activities.xlsx and activities_with_vec.pkl are out of sync)")
+    dims = {len(v) for v in df['activity_vector']}
+    if len(dims) > 1:
+        raise ValueError(f"activity vectors have mixed dims {sorted(dims)}")
+
+    vectors = l2_normalize(np.stack(df.pop('activity_vector').to_numpy()))
+    return df, vectors
+
+
+def validate_catalog(df, vectors, vector_dim=VECTOR_DIM):
+    """Raise ValueError if the catalog is empty or its vectors do not line up with its rows."""
+    if len(df) == 0:
+        raise ValueError("catalog has no activities")
+    if vectors.shape != (len(df), vector_dim):
+        raise ValueError(f"expected vectors of shape ({len(df)}, {vector_dim}), found {vectors.shape}")
+
+
+def file_signature(*paths):
+    """(mtime, size) of each file, or None if it does not exist."""
+    signature = []
+    for path in paths:
+        try:
+            st = os.stat(path)
+            signature.append((st.st_mtime_ns, st.st_size))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+
+class CatalogSnapshot:
+    """
+    One immutable version of the catalog. Requests hold on to the snapshot they started with.
+
+    - df: activity metadata, one row per activity (RangeIndex = row id)
+    - vectors: L2-normalized float32 [N, dim] activity embeddings, row-aligned with df
+    - lat_rad / lon_rad: activity coordinates in radians, precomputed for distance kernels
+    - spatial_index: radius index over the distinct community-club locations
+    - languages / source_types / time_slots: categorical columns as per-row bitmasks
+    - title_index / description_index: inverted token indexes for keyword matching
+    - titles / price / is_free: scoring columns as plain arrays
+    - interest_vocab: precomputed embeddings of common interest phrases (None if not built)
+    - ann_index: approximate nearest-neighbour index over `vectors` (None for small catalogs or if not built)
+    - fingerprint: id of the source files (mtime + size), stable across processes unlike `version`
+    """
+
+    __slots__ = ('df', 'vectors', 'lat_rad', 'lon_rad', 'spatial_index', 'titles', 'price', 'is_free',
+                 'languages', 'source_types', 'time_slots', 'title_index', 'description_index',
+                 'interest_vocab', 'ann_index', 'version', 'signature', 'fingerprint', 'source', 'loaded_at')
+
+    def __init__(self, df: pd.DataFrame, vectors: np.ndarray, version: int, signature: tuple, source: str,
+                 interest_vocab=None, ann_index=None):
+        self.df = df
+        self.vectors = vectors
+        self.interest_vocab = interest_vocab
+        self.ann_index = ann_index
+        self.lat_rad = to_radians(df['lat'])
+        self.lon_rad = to_radians(df['lon'])
+        self.spatial_index = SpatialIndex(self.lat_rad, self.lon_rad)
+        self.titles = df['title'].to_numpy(dtype=object)
+        self.price = pd.to_numeric(df['price_num'], errors='coerce').to_numpy(dtype=float)
+        self.is_free = pd.to_numeric(df['is_free'], errors='coerce').fillna(0).to_numpy(dtype=np.int8)
+        self.languages = BitmaskIndex(df['language'], split_pattern=LANGUAGE_SPLIT)
+        self.source_types = BitmaskIndex(df['source_type']) if 'source_type' in df.columns else None
+        self.time_slots = BitmaskIndex(df['time_slot'])
+        self.title_index = InvertedIndex(df['title'])
+        self.description_index = InvertedIndex(df['description'])
+        self.version = version
+        self.signature = signature
+        self.fingerprint = hashlib.md5(repr(signature).encode('utf-8')).hexdigest()[:16]
+        self.source = source
+        self.loaded_at = time.time()
+
+
+class ActivityCatalog:
+    """
+    Resident, read-only copy of the activity catalog.
+
+    The catalog is loaded once and shared by every recommendation request.
+    Callers must treat `snapshot.df` as immutable: filter or copy it before adding columns.
+    A new snapshot is built off the request path and swapped in with a single
+    reference assignment, so in-flight requests keep using the snapshot they read.
+    Loading happens at startup (load()); after a failed load the request path
+    sees no snapshot, and retries are left to the watcher or reload().
+    """
+
+    def __init__(self, activities_path: str = ACTIVITIES_PATH, vectors_path: str = VECTORS_PATH,
+                 bundle_dir: str = BUNDLE_DIR, poll_interval: float = POLL_INTERVAL):
+        self.activities_path = activities_path
+        self.vectors_path = vectors_path
+        self.bundle_dir = bundle_dir
+        self.poll_interval = poll_interval
+        self._snapshot = None
+        self._reload_lock = threading.Lock()
+        self._watcher = None
+        self._stop = threading.Event()
+
+    @property
+    def loaded(self) -> bool:
+        return self._snapshot is not None
+
+    @property
+    def snapshot(self) -> Optional[CatalogSnapshot]:
+        """Snapshot in service, or None if none loaded yet. Never loads: requests must not block on a parse."""
+        return self._snapshot
+
+    @property
+    def df(self) -> pd.DataFrame:
+        snapshot = self._snapshot
+        return snapshot.df if snapshot is not None else None
+
+    @property
+    def version(self) -> int:
+        snapshot = self._snapshot
+        return snapshot.version if snapshot is not None else 0
+
+    @property
+    def fingerprint(self) -> str:
+        """Catalog id shared by every process serving the same files (offline stores key on it)."""
+        snapshot = self._snapshot
+        return snapshot.fingerprint if snapshot is not None else ""
+
+    def source_paths(self) -> tuple:
+        """Files backing the catalog: the serving bundle if published, else xlsx + pickle."""
+        if bundle_exists(self.bundle_dir):
+            return bundle_paths(self.bundle_dir)
+        return (self.activities_path, self.vectors_path)
+
+    def signature(self) -> tuple:
+        return file_signature(*self.source_paths())
+
+    def load(self) -> bool:
+        """Load the catalog if it has not been loaded yet."""
+        if self._snapshot is not None:
+            return True
+        return self.reload()
+
+    def reload(self) -> bool:
+        """
+        Build and validate a new snapshot, then swap it in.
+        On any failure the current snapshot stays in service.
+        """
+        with self._reload_lock:
+            signature = self.signature()
+            try:
+                if bundle_exists(self.bundle_dir):
+                    source = "bundle"
+                    df, vectors, manifest = load_bundle(self.bundle_dir)
+                    if not manifest.get('normalized'):
+                        vectors = l2_normalize(vectors)
+                else:
+                    source = "xlsx"
+                    df, vectors = load_catalog_frame(self.activities_path, self.vectors_path)
+                validate_catalog(df, vectors)
+                interest_vocab = self._load_interest_vocab(vectors.shape[1])
+                ann_index = self._load_ann_index(vectors)
+                snapshot = CatalogSnapshot(df, vectors, self.version + 1, signature, source, interest_vocab, ann_index)
+            except Exception as e:
+                print(f"[catalog] Failed to load activity catalog: {e}")
+                return False
+            self._snapshot = snapshot  # atomic swap
+        print(f"[catalog] Loaded {len(df)} activities from {source} (version {snapshot.version})")
+        return True
+
+    def _load_interest_vocab(self, dim):
+        """Optional interest vocabulary table; a missing or mismatched table only disables the fast path."""
+        try:
+            vocab = load_interest_vocab(self.bundle_dir)
+        except Exception as e:
+            print(f"[catalog] Failed to load interest vocabulary: {e}")
+            return None
+        if vocab is not None and vocab.vectors.shape[1] != dim:
+            print(f"[catalog] Ignoring interest vocabulary: {vocab.vectors.shape[1]}-dim, catalog is {dim}-dim")
+            return None
+        return vocab
+
+    def _load_ann_index(self, vectors):
+        """Optional ANN index; only worth using once the catalog outgrows brute-force scoring."""
+        if len(vectors) < ANN_MIN_ROWS:
+            return None
+        try:
+            return load_ann_index(vectors, self.bundle_dir)
+        except Exception as e:
+            print(f"[catalog] Failed to load ANN index: {e}")
+            return None
+
+    # -----------------------------
+    # Background file watcher
+    # -----------------------------
+    def start_watcher(self):
+        """Poll the catalog files and reload in the background when they change."""
+        if self.poll_interval <= 0 or (self._watcher is not None and self._watcher.is_alive()):
+            return
+        self._stop.clear()
+        self._watcher = threading.Thread(target=self._watch, name="catalog-watcher", daemon=True)
+        self._watcher.start()
+
+    def stop_watcher(self):
+        self._stop.set()
+
+    def _watch(self):
+        pending = None
+        rejected = None
+        while not self._stop.wait(self.poll_interval):
+            try:
+                signature = self.signature()
+                current = self._snapshot.signature if self._snapshot is not None else None
+                if signature in (current, rejected) or None in signature:
+                    pending = None
+                    continue
+                # The pipeline rewrites files in place: only reload once they stopped changing
+                if signature != pending:
+                    pending = signature
+                    continue
+                pending = None
+                if not self.reload():
+                    rejected = signature
+            except Exception as e:  # keep watching: one bad publish must not end hot reload
+                print(f"[catalog] Watcher error: {e}")
+                pending = None
+
+
+_default_catalog = ActivityCatalog()
+
+
+def get_catalog() -> ActivityCatalog:
+    """Return the process-wide activity catalog."""
+    return _default_catalog
@@ -0,0 +1,94 @@
+import os
+from typing import Dict, Optional
+import numpy as np
+from chatbot.catalog_bundle import BUNDLE_DIR, l2_normalize
+
+ANN_FILE = 'ann_index.npz'
+ANN_MIN_ROWS = int(os.getenv("ANN_MIN_ROWS", "20000"))       # below this, brute force is exact and fast enough
+ANN_CANDIDATES = int(os.getenv("ANN_CANDIDATES", "2000"))    # M: semantic candidates handed to the filters
+ANN_NPROBE = int(os.getenv("ANN_NPROBE", "16"))              # inverted lists scanned per query
+
+
+class IVFIndex:
+    """
+    Inverted-file index over the L2-normalized activity vectors.
+
+    Rows are clustered around `nlist` centroids (spherical k-means, built
+    offline). A query scores the centroids, scans the rows of the `nprobe`
+    closest lists exactly, and returns the best `m` rows. Row ids are catalog
+    row ids, so the result plugs straight into the boolean-mask filters.
+    """
+
+    def __init__(self, centroids: np.ndarray, order: np.ndarray, offsets: np.ndarray, vectors: np.ndarray):
+        self.centroids = np.asarray(centroids, dtype=np.float32)
+        self.order = np.asarray(order, dtype=np.int64)      # row ids grouped by list
+        self.offsets = np.asarray(offsets, dtype=np.int64)  # list i = order[offsets[i]:offsets[i + 1]]
+        self.vectors = vectors
+
+    def __len__(self):
+        return len(self.order)
+
+    @property
+    def nlist(self) -> int:
+        return len(self.centroids)
+
+    def search(self, query: np.ndarray, m: int = ANN_CANDIDATES, nprobe: int = ANN_NPROBE) -> np.ndarray:
+        """Row ids of (approximately) the `m` rows most similar to `query`, in ascending row order."""
+        query = np.asarray(query, dtype=np.float32)
+        norm = np.linalg.norm(query)
+        if norm == 0:
+            return np.arange(len(self.order))
+        query = query / norm
+
+        nprobe = min(nprobe, self.nlist)
+        centroid_scores = self.centroids @ query
+        lists = np.argpartition(-centroid_scores, nprobe - 1)[:nprobe]
+        rows = np.concatenate([self.order[self.offsets[i]:self.offsets[i + 1]] for i in lists])
+        if len(rows) > m:
+            scores = self.vectors[rows] @ query
+            rows = rows[np.argpartition(-scores, m - 1)[:m]]
+        return np.sort(rows)
+
+
+def sample_rows(n: int) -> np.ndarray:
+    """Rows stored with the index to check it still matches the catalog vectors."""
+    return np.unique(np.linspace(0, n - 1, num=min(n, 64)).astype(np.int64))
+
+
+# -----------------------------
+# Build (data pipeline side) / load (serving side)
+# -----------------------------
+def build_ann_index(vectors, bundle_dir: str = BUNDLE_DIR, nlist: Optional[int] = None, seed: int = 0) -> Dict:
+    """Cluster the catalog vectors and store centroids + inverted lists next to the bundle."""
+    from sklearn.cluster import MiniBatchKMeans
+
+    vectors = l2_normalize(vectors)
+    n = len(vectors)
+    nlist = nlist or max(1, min(n, int(4 * np.sqrt(n))))
+    kmeans = MiniBatchKMeans(n_clusters=nlist, random_state=seed, batch_size=4096, n_init=1)
+    labels = kmeans.fit_predict(vectors)
+    centroids = l2_normalize(kmeans.cluster_centers_)
+
+    order = np.argsort(labels, kind='stable')
+    offsets = np.concatenate([[0], np.cumsum(np.bincount(labels, minlength=nlist))])
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    path = os.path.join(bundle_dir, ANN_FILE)
+    with open(path + '.tmp', 'wb') as f:
+        np.savez(f, centroids=centroids, order=order, offsets=offsets, rows=np.int64(n),
+                 sample=vectors[sample_rows(n)])
+    os.replace(path + '.tmp', path)
+    return {"path": path, "rows": n, "nlist": nlist}
+
+
+def load_ann_index(vectors, bundle_dir: str = BUNDLE_DIR) -> Optional[IVFIndex]:
+    """Load the index if it was built for exactly these vectors."""
+    path = os.path.join(bundle_dir, ANN_FILE)
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        if (int(data['rows']) != len(vectors) or data['centroids'].shape[1] != vectors.shape[1]
+                or not np.allclose(data['sample'], vectors[sample_rows(len(vectors))], atol=1e-4)):
+            print("[catalog] Ignoring ANN index: it was built for a different catalog")
+            return None
+        return IVFIndex(data['centroids'], data['order'], data['offsets'], vectors)
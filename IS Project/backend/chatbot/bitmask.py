@@ -0,0 +1,88 @@
+import re
+import numpy as np
+import pandas as pd
+
+WORD_BITS = 64
+
+
+def normalize_token(value) -> str:
+    return str(value).lower().strip()
+
+
+class BitmaskIndex:
+    """
+    Categorical column encoded as one integer bitmask per catalog row.
+
+    Values are normalized once at catalog build time into a vocabulary; bit i
+    of a row's mask is set when the row carries vocabulary token i. Missing
+    values get mask 0. Filtering a set of user values is then a single
+    vectorized bitwise AND. Up to 64 tokens a mask is one uint64 per row;
+    larger vocabularies use several 64-bit words per row.
+
+    For single-valued columns (time_slot, source_type) `codes` holds the row's
+    vocabulary code (token index + 1, 0 = missing) for table lookups.
+    """
+
+    def __init__(self, values, split_pattern: str = None):
+        splitter = re.compile(split_pattern) if split_pattern else None
+
+        row_tokens = []
+        for value in values:
+            if pd.isna(value):
+                row_tokens.append([])
+                continue
+            parts = splitter.split(str(value)) if splitter else [str(value)]
+            row_tokens.append([normalize_token(p) for p in parts if p.strip()])
+
+        vocab = sorted({t for tokens in row_tokens for t in tokens})
+        self.words = max(1, -(-len(vocab) // WORD_BITS))
+        self.vocab = {token: i for i, token in enumerate(vocab)}  # token -> bit
+        self.codes_by_token = {token: i + 1 for i, token in enumerate(vocab)}
+
+        masks = np.zeros((len(row_tokens), self.words), dtype=np.uint64)
+        codes = np.zeros(len(row_tokens), dtype=np.int8 if len(vocab) < 127 else np.int32)
+        for i, tokens in enumerate(row_tokens):
+            for t in tokens:
+                bit = self.vocab[t]
+                masks[i, bit // WORD_BITS] |= np.uint64(1 << (bit % WORD_BITS))
+            if tokens:
+                codes[i] = self.codes_by_token[tokens[0]]
+        # Single-word masks stay 1-D so the common case is one AND per row
+        self.masks = masks[:, 0].copy() if self.words == 1 else masks
+        self.codes = codes
+
+    def lookup_table(self, values, hit, miss, missing) -> np.ndarray:
+        """Per-code table: `hit` for the given values, `miss` for other codes, `missing` for code 0."""
+        if isinstance(values, str):
+            values = [values]
+        table = np.full(len(self.codes_by_token) + 1, miss, dtype=float)
+        table[0] = missing
+        for value in values or []:
+            code = self.codes_by_token.get(normalize_token(value))
+            if code is not None:
+                table[code] = hit
+        return table
+
+    def mask_for(self, values):
+        """Bitmask of the given values (one uint64, or one per word); unknown values contribute nothing."""
+        if isinstance(values, str):
+            values = [values]
+        words = np.zeros(self.words, dtype=np.uint64)
+        for value in values or []:
+            bit = self.vocab.get(normalize_token(value))
+            if bit is not None:
+                words[bit // WORD_BITS] |= np.uint64(1 << (bit % WORD_BITS))
+        return words[0] if self.words == 1 else words
+
+    def _rows(self, rows):
+        return self.masks if rows is None else self.masks[rows]
+
+    def match(self, values, rows=None) -> np.ndarray:
+        """Boolean mask of rows carrying any of the given values (optionally only for `rows`)."""
+        hits = (self._rows(rows) & self.mask_for(values)) != 0
+        return hits if self.words == 1 else hits.any(axis=1)
+
+    def known(self, rows=None) -> np.ndarray:
+        """Boolean mask of rows with a non-missing value."""
+        known = self._rows(rows) != 0
+        return known if self.words == 1 else known.any(axis=1)
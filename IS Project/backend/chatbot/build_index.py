@@ -1,7 +1,7 @@
 import os
 from langchain.docstore.document import Document
 from langchain_pinecone import PineconeVectorStore
-from rag_utils import DoubaoEmbeddings, INDEX_NAME, pc
+from rag_utils import DoubaoEmbeddings, INDEX_NAME, get_pinecone
 
 # ---------------- Helpers ----------------
 def txt_to_docs(txt_path: str):
@@ -37,7 +37,7 @@ def upload_all_txt(docs_dir: str = "chatbot/docs"):
 
 def remove_records_in_index(index_name: str):
     """Remove all vectors and records in the index"""
-    index = pc.Index(index_name)
+    index = get_pinecone().Index(index_name)
     index.delete(delete_all=True)
     stats = index.describe_index_stats()
     print(stats)
@@ -0,0 +1,132 @@
+import os
+import io
+import json
+import time
+import hashlib
+import numpy as np
+import pandas as pd
+
+BASE_DIR = os.path.dirname(__file__)
+BUNDLE_DIR = os.path.join(BASE_DIR, '..', 'data', 'catalog_bundle')
+
+MANIFEST_FILE = 'manifest.json'
+METADATA_FILE = 'metadata.parquet'
+VECTORS_FILE = 'vectors.npy'
+FORMAT_VERSION = 2  # 2: manifest carries metadata / vectors checksums
+
+# Serving columns and their storage types. Only what the recommender reads is shipped.
+STRING_COLUMNS = ['id', 'title', 'category', 'subcategory', 'description', 'language',
+                  'date', 'start_time', 'end_time', 'time_slot', 'source_type']
+FLOAT_COLUMNS = ['lat', 'lon', 'price_num', 'capacity', 'enrolled']
+INT_COLUMNS = ['is_free']
+
+
+def bundle_paths(bundle_dir=BUNDLE_DIR):
+    """manifest, metadata and vectors paths of a bundle directory."""
+    return (os.path.join(bundle_dir, MANIFEST_FILE),
+            os.path.join(bundle_dir, METADATA_FILE),
+            os.path.join(bundle_dir, VECTORS_FILE))
+
+
+def bundle_exists(bundle_dir=BUNDLE_DIR):
+    return os.path.exists(os.path.join(bundle_dir, MANIFEST_FILE))
+
+
+def to_serving_frame(df):
+    """Project the activity table onto the typed serving columns."""
+    out = pd.DataFrame(index=pd.RangeIndex(len(df)))
+    for col in STRING_COLUMNS:
+        values = df[col] if col in df.columns else pd.Series([None] * len(df))
+        out[col] = [None if pd.isna(v) else str(v) for v in values]
+    for col in FLOAT_COLUMNS:
+        values = df[col] if col in df.columns else pd.Series([np.nan] * len(df))
+        out[col] = pd.to_numeric(pd.Series(values.to_numpy()), errors='coerce').astype('float64')
+    for col in INT_COLUMNS:
+        values = df[col] if col in df.columns else pd.Series([0] * len(df))
+        out[col] = pd.to_numeric(pd.Series(values.to_numpy()), errors='coerce').fillna(0).astype('int8')
+    return out
+
+
+def l2_normalize(vectors):
+    """Row-wise L2 normalization to a contiguous float32 matrix (zero rows stay zero)."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return np.ascontiguousarray(vectors / norms, dtype=np.float32)
+
+
+def checksum(data) -> str:
+    """md5 of a bytes-like object (file contents, or a contiguous array's buffer)."""
+    return hashlib.md5(data).hexdigest()
+
+
+# -----------------------------
+# Writing (data pipeline side)
+# -----------------------------
+def write_bundle(df, vectors, bundle_dir=BUNDLE_DIR):
+    """
+    Write the serving bundle: typed metadata, one contiguous L2-normalized
+    float32 [N, dim] vector matrix, and a manifest with checksums of both.
+    The files are replaced one at a time, so a reader can briefly see new
+    metadata next to old vectors; load_bundle() rejects such pairs by checksum.
+    """
+    vectors = l2_normalize(vectors)
+    if vectors.ndim != 2 or vectors.shape[0] != len(df):
+        raise ValueError(f"vectors shape {vectors.shape} does not match {len(df)} activities")
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    manifest_path, metadata_path, vectors_path = bundle_paths(bundle_dir)
+
+    to_serving_frame(df).to_parquet(metadata_path + '.tmp', index=False)
+    with open(metadata_path + '.tmp', 'rb') as f:
+        metadata_checksum = checksum(f.read())
+    with open(vectors_path + '.tmp', 'wb') as f:
+        np.save(f, vectors)
+    manifest = {
+        'format_version': FORMAT_VERSION,
+        'rows': int(vectors.shape[0]),
+        'dim': int(vectors.shape[1]),
+        'normalized': True,
+        'metadata_md5': metadata_checksum,
+        'vectors_md5': checksum(vectors),
+        'created_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    with open(manifest_path + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+
+    os.replace(metadata_path + '.tmp', metadata_path)
+    os.replace(vectors_path + '.tmp', vectors_path)
+    os.replace(manifest_path + '.tmp', manifest_path)
+    return manifest
+
+
+# -----------------------------
+# Reading (serving side)
+# -----------------------------
+def load_bundle(bundle_dir=BUNDLE_DIR):
+    """
+    Load a serving bundle. The vector matrix is memory-mapped read-only, so
+    the load does not copy it and workers share the pages through the OS cache.
+
+    Checksums are taken over exactly the bytes being served (the metadata read
+    once into memory, the mapped vectors), so files from two different publishes
+    are rejected even when their shapes agree.
+    """
+    manifest_path, metadata_path, vectors_path = bundle_paths(bundle_dir)
+    with open(manifest_path, encoding='utf-8') as f:
+        manifest = json.load(f)
+
+    with open(metadata_path, 'rb') as f:
+        metadata = f.read()
+    df = pd.read_parquet(io.BytesIO(metadata))
+    vectors = np.load(vectors_path, mmap_mode='r')
+
+    if len(df) != manifest['rows'] or vectors.shape != (manifest['rows'], manifest['dim']):
+        raise ValueError(f"bundle is inconsistent: manifest {manifest['rows']}x{manifest['dim']}, "
+                         f"metadata {len(df)} rows, vectors {vectors.shape}")
+    # Bundles from before format 2 carry no checksums
+    if 'metadata_md5' in manifest and checksum(metadata) != manifest['metadata_md5']:
+        raise ValueError("bundle is inconsistent: metadata does not match the manifest (publish in progress?)")
+    if 'vectors_md5' in manifest and checksum(vectors) != manifest['vectors_md5']:
+        raise ValueError("bundle is inconsistent: vectors do not match the manifest (publish in progress?)")
+    return df, vectors, manifest
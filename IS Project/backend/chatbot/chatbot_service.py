@@ -3,18 +3,100 @@ from pydantic import BaseModel
 import textwrap
 import html
 
-from chatbot.recommender import ElderlyActivityRecommender
-from chatbot.rag import rag_answer
-from chatbot.intent_classifier import IntentClassifier
-from chatbot.profile_parser import ProfileParser
+from chatbot.components import LazyComponent
 from chatbot.context_manager import ContextManager
+from chatbot.intent_router import intent_router
+
+
+# ---------------- Components (built lazily / by warm-up) ----------------
+# The heavy imports live inside the factories, so importing this module is cheap
+# and the startup log shows what each component costs.
+def _load_embedding_model():
+    from chatbot.embedding_runtime import DEFAULT_MODEL_NAME, get_runtime
+
+    runtime = get_runtime(DEFAULT_MODEL_NAME)
+    runtime.load()
+    runtime.encode(["warm up"])  # first forward pass allocates buffers
+    return runtime
+
+
+def _load_recommender():
+    from chatbot.recommender import ElderlyActivityRecommender
+
+    # Loads the activity catalog and starts its watcher
+    return ElderlyActivityRecommender(model_path=None)
+
+
+def _load_intent_classifier():
+    from chatbot.intent_classifier import IntentClassifier
+
+    return IntentClassifier()
+
+
+def _load_profile_parser():
+    from chatbot.profile_parser import ProfileParser
+
+    return ProfileParser()
+
+
+def _load_rag():
+    # Pre-pay the LangChain / Pinecone imports before the first health question
+    import chatbot.rag  # noqa: F401
+    from langchain_pinecone import PineconeVectorStore  # noqa: F401
+    from langchain.chains.question_answering import load_qa_chain  # noqa: F401
+    from chatbot.rag_utils import get_llm
+
+    return get_llm()
+
+
+embedding_model_component = LazyComponent("embedding_model", _load_embedding_model)
+# Built even if the catalog fails to load (the watcher or /catalog/reload can still
+# bring it in without a restart), but only ready once a snapshot is in service
+recommender_component = LazyComponent("recommender", _load_recommender,
+                                      ready_check=lambda recommender: recommender.catalog.loaded,
+                                      not_ready_reason="activity catalog is not loaded")
+intent_classifier_component = LazyComponent("intent_classifier", _load_intent_classifier)
+profile_parser_component = LazyComponent("profile_parser", _load_profile_parser)
+# Health QA depends on external services; the API is ready without it
+rag_component = LazyComponent("rag", _load_rag, required=False)
+
+# Warm-up order: the shared model first, since the recommender and classifier use it
+COMPONENTS = [
+    embedding_model_component,
+    recommender_component,
+    intent_classifier_component,
+    profile_parser_component,
+    rag_component,
+]
+
+
+def get_recommender():
+    return recommender_component.get()
+
+
+def get_intent_classifier():
+    return intent_classifier_component.get()
+
+
+def get_profile_parser():
+    return profile_parser_component.get()
+
+
+def rag_answer(query: str, top_k: int = 3):
+    from chatbot.rag import rag_answer as _rag_answer
+
+    return _rag_answer(query, top_k=top_k)
+
+
+def __getattr__(name):
+    # `from chatbot.chatbot_service import recommender` keeps working (and builds on demand)
+    getters = {"recommender": get_recommender, "intent_clf": get_intent_classifier,
+               "profile_parser": get_profile_parser}
+    if name in getters:
+        return getters[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
-# Initialize recommender (load model if any)
-recommender = ElderlyActivityRecommender(model_path=None)
-# Initialize the intent classifier globally
-intent_clf = IntentClassifier()
-# Initialize profile parser
-profile_parser = ProfileParser()
 # Initialize context manager
 context_manager = ContextManager()
 
@@ -30,6 +112,7 @@ class ChatRequest(BaseModel):
     message: str
     context: Optional[Dict] = None
     profile: Optional[Dict] = None
+    user_id: Optional[str] = None  # registered user (data/users.xlsx id), enables precomputed recommendations
 
 
 class ChatResponse(BaseModel):
@@ -47,6 +130,9 @@ def _needs_location_selection(profile: Dict) -> bool:
     lon = profile.get("lon")
     return lat is None or lon is None or lat == 0 or lon == 0
 
+# Location label of profiles whose lat/lon were picked at random (not the user's own)
+RANDOM_LOCATION = "Random HDB Area"
+
 def update_profile_with_random_location(profile: dict) -> dict:
     """
     Update the user's profile with a random HDB latitude/longitude pair.
@@ -69,7 +155,7 @@ def update_profile_with_random_location(profile: dict) -> dict:
     lat, lon = random.choice(hdb_locations)
     profile["lat"] = lat
     profile["lon"] = lon
-    profile["location"] = "Random HDB Area"
+    profile["location"] = RANDOM_LOCATION
 
     return profile
 
@@ -97,23 +183,29 @@ def handle_chat(payload):
     user_msg = payload.message.lower()
     original_msg = payload.message
     session_id = payload.session_id or "default"
+    # Registered users (data/users.xlsx ids) may have precomputed recommendations
+    user_id = payload.user_id or (payload.profile or {}).get("user_id")
     print(f"session_id: {session_id}")
     history = context_manager.get_history(session_id, limit=3)
     # Store user message in context manager
     context_manager.add_message(session_id, "user", original_msg)
     
-    # 1. Rule-based intent detection (highest priority)
-    # Keywords that strongly indicate recommendation request
-    rec_keywords = ["recommend", "activity", "suggestion", "recommendation", "suggest"]
-    print(f"[DEBUG] Rule-based check: user_msg='{user_msg}', rec_keywords={rec_keywords}")
-    if any(k in user_msg for k in rec_keywords):
-        print(f"[DEBUG] Rule-based: Entering recommendation flow")
+    # 1. Tiered intent routing: the phrase matcher decides confident cases,
+    # the ML classifier (embedding + LogisticRegression) only runs when it is unsure
+    # Build context-aware input for classifier
+    history_text = " ".join([f"{h['role']}: {h['content']}" for h in history])
+    classifier_input = f"{history_text}\nuser: {user_msg}"
+    decision = intent_router.route(user_msg, fallback=lambda: get_intent_classifier().predict(classifier_input))
+    intent = decision.intent
+
+    if decision.tier == "fast" and intent == "recommend_activity":
+        print(f"[DEBUG] Fast tier: Entering recommendation flow")
         
         # parse user profile from current message + recent history
-        new_profile = profile_parser.parse_user_profile(
+        new_profile = get_profile_parser().parse_user_profile(
             user_msg, conversation_history=history
         )
-        new_profile = profile_parser.enhance_profile_with_location(new_profile)
+        new_profile = get_profile_parser().enhance_profile_with_location(new_profile)
         new_profile = update_profile_with_random_location(new_profile)
         # Get existing profile and merge
         existing_profile = context_manager.get_profile(session_id)
@@ -128,7 +220,8 @@ def handle_chat(payload):
 
         # Profile complete with location, proceed to recommend
         print(f"[recommendation] Final profile: {profile}")
-        recs = recommender.recommend(profile=profile, vitals=None)
+        recs = get_recommender().recommend(profile=profile, vitals=None, user_id=user_id,
+                                           location_known=profile.get("location") != RANDOM_LOCATION)
 
         if not recs:
             return {"answer": "I couldn't find suitable activities right now.", "result": []}
@@ -152,19 +245,16 @@ def handle_chat(payload):
         }
 
 
-    # 2. Intent classifier (ML-based routing)
-    # Build context-aware input for classifier
-    history_text = " ".join([f"{h['role']}: {h['content']}" for h in history])
-    classifier_input = f"{history_text}\nuser: {user_msg}"
-    intent = intent_clf.predict(classifier_input)
-    print(f"[DEBUG] Intent classifier input: '{classifier_input}'")
-    print(f"[DEBUG] Intent classifier result: '{intent}'")
+    # 2. Routed intent (fast tier or ML classifier)
+    if decision.tier == "model":
+        print(f"[DEBUG] Intent classifier input: '{classifier_input}'")
+        print(f"[DEBUG] Intent classifier result: '{intent}'")
 
     if intent == "recommend_activity":
         existing_profile = context_manager.get_profile(session_id)
         print(f"[recommendation] Existing profile: {existing_profile}")
         # Update profile with parsed info from current message + recent history
-        new_profile = profile_parser.parse_user_profile(
+        new_profile = get_profile_parser().parse_user_profile(
             user_msg, conversation_history=context_manager.get_history(session_id)
         )
         profile = context_manager.update_profile(session_id, new_profile)
@@ -180,7 +270,8 @@ def handle_chat(payload):
 
         # profile complete with location, proceed to recommend
         print(f"[recommendation] Final profile: {profile}")
-        recs = recommender.recommend(profile=profile, vitals=None)
+        recs = get_recommender().recommend(profile=profile, vitals=None, user_id=user_id,
+                                           location_known=profile.get("location") != RANDOM_LOCATION)
 
         if not recs:
             return {"answer": "I couldn't find suitable activities right now.", "result": []}
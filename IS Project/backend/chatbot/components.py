@@ -0,0 +1,98 @@
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+# name -> seconds spent importing / initializing it, in startup order
+STARTUP_TIMINGS: Dict[str, float] = {}
+
+
+@contextmanager
+def timed(name: str):
+    """Record how long a block (an import, a model load) takes under `name`."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        STARTUP_TIMINGS[name] = round(time.perf_counter() - start, 3)
+        print(f"[startup] {name}: {STARTUP_TIMINGS[name]:.2f}s")
+
+
+class LazyComponent:
+    """
+    Process-wide singleton built on first use (or by warm-up) instead of at import.
+
+    get() is thread-safe: concurrent callers wait for the one build in progress,
+    so it blocks; async handlers must call it from the threadpool, never on the
+    event loop (that would stall /health and /ready during warm-up).
+    A failed build is remembered for readiness reporting and retried on the next get().
+    `ready_check` covers components that can be built but not yet serving (e.g. a
+    recommender whose catalog failed to load); they stay not ready until it passes.
+    """
+
+    def __init__(self, name: str, factory: Callable, required: bool = True,
+                 ready_check: Optional[Callable] = None, not_ready_reason: str = "not ready"):
+        self.name = name
+        self.factory = factory
+        self.required = required
+        self.ready_check = ready_check
+        self.not_ready_reason = not_ready_reason
+        self.error = None
+        self._instance = None
+        self._lock = threading.Lock()
+
+    @property
+    def built(self) -> bool:
+        return self._instance is not None
+
+    @property
+    def ready(self) -> bool:
+        instance = self._instance
+        return instance is not None and (self.ready_check is None or bool(self.ready_check(instance)))
+
+    def get(self):
+        if self._instance is None:
+            with self._lock:
+                if self._instance is None:
+                    try:
+                        with timed(self.name):
+                            self._instance = self.factory()
+                        self.error = None
+                    except Exception as e:
+                        self.error = f"{type(e).__name__}: {e}"
+                        raise
+        return self._instance
+
+    def status(self) -> Dict:
+        if self.ready:
+            state, error = "ready", None
+        elif self.built:
+            state, error = "not_ready", self.not_ready_reason
+        else:
+            state, error = ("failed" if self.error else "pending"), self.error
+        return {"status": state, "required": self.required, "seconds": STARTUP_TIMINGS.get(self.name),
+                "error": error}
+
+
+def warm_up(components: List[LazyComponent]):
+    """Build every component in order; failures are logged and left for readiness to report."""
+    for component in components:
+        try:
+            component.get()
+        except Exception as e:
+            print(f"[startup] {component.name} failed: {e}")
+
+
+def start_warm_up(components: List[LazyComponent]) -> threading.Thread:
+    thread = threading.Thread(target=warm_up, args=(components,), name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+def readiness(components: List[LazyComponent]) -> Dict:
+    statuses = {c.name: c.status() for c in components}
+    return {
+        "ready": all(c.ready for c in components if c.required),
+        "components": statuses,
+        "startup_timings": dict(STARTUP_TIMINGS),
+    }
@@ -0,0 +1,134 @@
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left
+from concurrent.futures import Future
+from typing import Callable, Dict, List
+import numpy as np
+
+BATCH_MAX_TEXTS = int(os.getenv("EMBEDDING_BATCH_MAX", "32"))
+BATCH_MAX_WAIT_MS = float(os.getenv("EMBEDDING_BATCH_WAIT_MS", "5"))
+
+
+class Histogram:
+    """Counts per upper bucket bound (last bucket is open-ended), plus count/sum."""
+
+    def __init__(self, bounds):
+        self.bounds = list(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def snapshot(self) -> Dict:
+        labels = [f"<={b:g}" for b in self.bounds] + [f">{self.bounds[-1]:g}"]
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 3) if self.count else 0.0,
+            "buckets": dict(zip(labels, self.counts)),
+        }
+
+
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent encode calls into shared model batches.
+
+    Callers enqueue their texts and wait on a future. A worker thread takes
+    the first waiting request, keeps collecting until `max_texts` texts are
+    queued or `max_wait_ms` has passed since that request arrived, then runs
+    one encode over all of them and hands each caller its slice. If that
+    shared encode fails, each request is retried alone so one bad input
+    does not fail the others.
+    """
+
+    def __init__(self, encode_fn: Callable[[List[str]], np.ndarray],
+                 max_texts: int = BATCH_MAX_TEXTS, max_wait_ms: float = BATCH_MAX_WAIT_MS):
+        self.encode_fn = encode_fn
+        self.max_texts = max_texts
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self._stats_lock = threading.Lock()
+        self.batch_sizes = Histogram([1, 2, 4, 8, 16, 32, 64])
+        self.queue_wait_ms = Histogram([0.5, 1, 2, 5, 10, 20, 50])
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="embedding-batcher", daemon=True)
+                self._worker.start()
+
+    def submit(self, texts: List[str]) -> Future:
+        """Queue texts for embedding; the future resolves to a float32 [len(texts), dim] array."""
+        future = Future()
+        self._ensure_worker()
+        self._queue.put((list(texts), future, time.perf_counter()))
+        return future
+
+    def encode(self, texts: List[str]) -> np.ndarray:
+        return self.submit(texts).result()
+
+    def _collect(self):
+        """Block for the first request, then gather more until the size or deadline is hit."""
+        batch = [self._queue.get()]
+        size = len(batch[0][0])
+        deadline = batch[0][2] + self.max_wait
+        while size < self.max_texts:
+            remaining = deadline - time.perf_counter()
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            batch.append(item)
+            size += len(item[0])
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            flushed_at = time.perf_counter()
+            texts = [t for item in batch for t in item[0]]
+            try:
+                vectors = np.asarray(self.encode_fn(texts), dtype=np.float32)
+            except Exception as e:
+                if len(batch) == 1:
+                    batch[0][1].set_exception(e)
+                else:
+                    print(f"[embedding] Batch of {len(batch)} requests failed ({e}); encoding them one by one")
+                    self._run_each(batch)
+                continue
+
+            with self._stats_lock:
+                self.batch_sizes.observe(len(texts))
+                for _, _, queued_at in batch:
+                    self.queue_wait_ms.observe((flushed_at - queued_at) * 1000)
+
+            start = 0
+            for item_texts, future, _ in batch:
+                future.set_result(vectors[start:start + len(item_texts)])
+                start += len(item_texts)
+
+    def _run_each(self, batch):
+        """Encode each request on its own, so only the one that fails gets the error."""
+        for item_texts, future, _ in batch:
+            try:
+                future.set_result(np.asarray(self.encode_fn(item_texts), dtype=np.float32))
+            except Exception as e:
+                future.set_exception(e)
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            return {
+                "max_texts": self.max_texts,
+                "max_wait_ms": self.max_wait * 1000,
+                "batch_size": self.batch_sizes.snapshot(),
+                "queue_wait_ms": self.queue_wait_ms.snapshot(),
+            }
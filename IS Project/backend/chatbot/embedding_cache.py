@@ -0,0 +1,124 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+import numpy as np
+
+CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+CACHE_TTL = float(os.getenv("EMBEDDING_CACHE_TTL", "0"))  # seconds, 0 = never expire
+
+
+def normalize_text(text: str) -> str:
+    """Cache key form of a query: lower-cased, whitespace collapsed (MiniLM is uncased)."""
+    return " ".join(str(text).lower().split())
+
+
+class LRUCache:
+    """Thread-safe bounded LRU mapping with optional TTL and hit/miss counters."""
+
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl if ttl and ttl > 0 else None
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is not None and self.ttl is not None and time.monotonic() - item[1] > self.ttl:
+                del self._data[key]
+                item = None
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value):
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = (value, time.monotonic())
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+class EmbeddingCache:
+    """
+    Sentence-embedding cache shared by every encoder call site.
+
+    Lookups go through three tiers: an optional precomputed vocabulary table
+    (common interest phrases), the LRU keyed by (model name, normalized text),
+    and finally the model. Misses in one call are encoded in a single batch.
+    """
+
+    def __init__(self, maxsize: int = CACHE_SIZE, ttl: Optional[float] = CACHE_TTL):
+        self._cache = LRUCache(maxsize, ttl)
+        self.lookups = 0
+        self.vocab_hits = 0
+        self.encoded = 0
+
+    def encode(self, model, model_name: str, texts: List[str], vocabulary=None) -> np.ndarray:
+        """
+        Embeddings for `texts` as a float32 [len(texts), dim] array.
+        vocabulary: optional InterestVocabulary built with the same model.
+        """
+        if vocabulary is not None and vocabulary.model_name != model_name:
+            vocabulary = None
+        keys = [(model_name, normalize_text(t)) for t in texts]
+        vectors = [vocabulary.get(t) if vocabulary is not None else None for t in texts]
+        vocab_hits = sum(v is not None for v in vectors)
+        vectors = [v if v is not None else self._cache.get(k) for v, k in zip(vectors, keys)]
+
+        missing = [i for i, v in enumerate(vectors) if v is None]
+        if missing:
+            encoded = np.asarray(model.encode([keys[i][1] for i in missing]), dtype=np.float32)
+            for i, vec in zip(missing, encoded):
+                vec = vec.copy()
+                vec.flags.writeable = False
+                self._cache.put(keys[i], vec)
+                vectors[i] = vec
+
+        self.lookups += len(texts)
+        self.vocab_hits += vocab_hits
+        self.encoded += len(missing)
+        return np.stack(vectors) if vectors else np.empty((0, 0), dtype=np.float32)
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict:
+        stats = self._cache.stats()
+        stats.update({
+            "lookups": self.lookups,
+            "vocab_hits": self.vocab_hits,
+            "vocab_hit_ratio": round(self.vocab_hits / self.lookups, 4) if self.lookups else 0.0,
+            "encoded": self.encoded,
+        })
+        return stats
+
+
+# Process-wide cache used by the recommender and the intent classifier
+embedding_cache = EmbeddingCache()
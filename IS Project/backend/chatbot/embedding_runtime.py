@@ -0,0 +1,110 @@
+import os
+import threading
+import time
+from typing import Dict, List
+import numpy as np
+from chatbot.embedding_batcher import EmbeddingBatcher
+
+MICRO_BATCHING = os.getenv("EMBEDDING_MICRO_BATCHING", "1") == "1"
+BACKEND = os.getenv("EMBEDDING_BACKEND", "torch")  # torch | onnx | onnx-int8
+
+DEFAULT_MODEL_NAME = 'all-MiniLM-L6-v2'
+
+
+class EmbeddingRuntime:
+    """
+    One process-wide SentenceTransformer per model name.
+
+    The weights are loaded on first use (or by an explicit load()) and shared
+    by every consumer: the recommender, the intent classifier and the data
+    pipeline. Plain encode(texts) calls from concurrent request threads are
+    coalesced by a micro-batcher into shared model batches; calls with encode
+    options (e.g. batch_size in the data pipeline) run directly. Model access
+    is serialized with a lock either way.
+
+    The backend is pluggable: "torch" (SentenceTransformer), or "onnx" /
+    "onnx-int8" (onnxruntime over a model exported by data/export_onnx.py,
+    no torch import). A missing ONNX export falls back to torch.
+    """
+
+    def __init__(self, model_name: str = DEFAULT_MODEL_NAME, micro_batching: bool = MICRO_BATCHING,
+                 backend: str = BACKEND):
+        self.model_name = model_name
+        self.backend = backend
+        self._model = None
+        self._load_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+        self.load_seconds = None
+        self.batcher = EmbeddingBatcher(self._encode_direct) if micro_batching else None
+
+    @property
+    def loaded(self) -> bool:
+        return self._model is not None
+
+    @property
+    def model(self):
+        if self._model is None:
+            self.load()
+        return self._model
+
+    def load(self):
+        """Load the model weights once; later calls are no-ops."""
+        with self._load_lock:
+            if self._model is None:
+                start = time.perf_counter()
+                self._model = self._load_backend()
+                self.load_seconds = time.perf_counter() - start
+                print(f"[embedding] Loaded {self.model_name} ({self.backend}) in {self.load_seconds:.1f}s")
+        return self._model
+
+    def _load_backend(self):
+        if self.backend in ("onnx", "onnx-int8"):
+            try:
+                from chatbot.onnx_backend import load_onnx_encoder
+
+                return load_onnx_encoder(self.model_name, quantized=self.backend == "onnx-int8")
+            except Exception as e:
+                print(f"[embedding] ONNX backend unavailable ({e}); falling back to torch")
+                self.backend = "torch"
+        from sentence_transformers import SentenceTransformer
+
+        return SentenceTransformer(self.model_name)
+
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        """Thread-safe SentenceTransformer.encode returning float32 embeddings."""
+        if self.batcher is not None and not kwargs:
+            return self.batcher.encode(texts)
+        return self._encode_direct(texts, **kwargs)
+
+    def _encode_direct(self, texts: List[str], **kwargs) -> np.ndarray:
+        model = self.model
+        with self._encode_lock:
+            vectors = model.encode(texts, **kwargs)
+        return np.asarray(vectors, dtype=np.float32)
+
+    def stats(self) -> Dict:
+        return {
+            "model": self.model_name,
+            "backend": self.backend,
+            "loaded": self.loaded,
+            "load_seconds": self.load_seconds,
+            "micro_batching": self.batcher.stats() if self.batcher is not None else None,
+        }
+
+
+_runtimes: Dict[str, EmbeddingRuntime] = {}
+_registry_lock = threading.Lock()
+
+
+def get_runtime(model_name: str = DEFAULT_MODEL_NAME) -> EmbeddingRuntime:
+    """The shared runtime for `model_name` (created on first request)."""
+    with _registry_lock:
+        runtime = _runtimes.get(model_name)
+        if runtime is None:
+            runtime = _runtimes[model_name] = EmbeddingRuntime(model_name)
+        return runtime
+
+
+def runtime_stats() -> Dict:
+    with _registry_lock:
+        return {name: runtime.stats() for name, runtime in _runtimes.items()}
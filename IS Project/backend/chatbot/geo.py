@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+from sklearn.neighbors import BallTree
+
+EARTH_RADIUS_KM = 6371.0088  # mean earth radius, same constant as the haversine package
+
+
+def to_radians(values):
+    """Coerce coordinates to float (invalid → NaN) and convert degrees to radians."""
+    return np.radians(pd.to_numeric(pd.Series(values), errors='coerce').to_numpy(dtype=float))
+
+
+def haversine_distances(lat_rad, lon_rad, user_lat, user_lon):
+    """
+    Great-circle distance (km) from one user location to many points, in one call.
+
+    lat_rad / lon_rad: point coordinates already in radians (precomputed at catalog load).
+    Points with missing coordinates get an infinite distance.
+    """
+    user_lat_rad = np.radians(user_lat)
+    user_lon_rad = np.radians(user_lon)
+
+    d = (np.sin((lat_rad - user_lat_rad) * 0.5) ** 2
+         + np.cos(user_lat_rad) * np.cos(lat_rad) * np.sin((lon_rad - user_lon_rad) * 0.5) ** 2)
+    distances = 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(d, 1.0)))
+    distances[np.isnan(distances)] = np.inf
+    return distances
+
+
+# -----------------------------
+# Spatial index over distinct locations
+# -----------------------------
+class SpatialIndex:
+    """
+    Radius index over the distinct activity locations.
+
+    Activities are geo-tagged by community-club coordinates, so thousands of rows
+    share a few hundred points. Rows are grouped by point (CSR layout) and a
+    haversine BallTree is built over the points, so radius queries and distances
+    are computed once per distinct location instead of once per activity.
+    """
+
+    def __init__(self, lat_rad, lon_rad):
+        coords = np.column_stack([lat_rad, lon_rad]).astype(float)
+        valid = ~np.isnan(coords).any(axis=1)
+        points, inverse = np.unique(coords[valid], axis=0, return_inverse=True)
+        inverse = inverse.ravel()
+
+        self.points = points
+        # row -> point id, -1 for rows without coordinates
+        self.point_of_row = np.full(len(coords), -1, dtype=np.int64)
+        self.point_of_row[valid] = inverse
+        # rows of point p are row_ids[offsets[p]:offsets[p + 1]], ascending
+        self.row_ids = np.flatnonzero(valid)[np.argsort(inverse, kind='stable')]
+        self.offsets = np.concatenate([[0], np.cumsum(np.bincount(inverse, minlength=len(points)))])
+        self.tree = BallTree(points, metric='haversine') if len(points) else None
+
+    def __len__(self):
+        return len(self.points)
+
+    def point_distances(self, user_lat, user_lon, points=None):
+        """Distance (km) from the user to each distinct location (or the given point ids)."""
+        selected = self.points if points is None else self.points[points]
+        return haversine_distances(selected[:, 0], selected[:, 1], user_lat, user_lon)
+
+    def distances(self, user_lat, user_lon):
+        """Distance (km) of every catalog row; rows without coordinates get inf."""
+        point_dist = np.append(self.point_distances(user_lat, user_lon), np.inf)
+        return point_dist[self.point_of_row]
+
+    def query_radius(self, user_lat, user_lon, max_distance):
+        """Catalog row ids (ascending) within max_distance km, and their distances."""
+        if self.tree is None:
+            return np.empty(0, dtype=np.int64), np.empty(0)
+        user = np.radians([[user_lat, user_lon]])
+        points = self.tree.query_radius(user, r=max_distance / EARTH_RADIUS_KM)[0]
+        point_dist = self.point_distances(user_lat, user_lon, points)
+        within = point_dist <= max_distance
+        points, point_dist = points[within], point_dist[within]
+
+        # Expand matched points to their rows
+        starts = self.offsets[points]
+        counts = self.offsets[points + 1] - starts
+        positions = np.repeat(starts - np.cumsum(counts) + counts, counts) + np.arange(counts.sum())
+        rows = self.row_ids[positions]
+        distances = np.repeat(point_dist, counts)
+
+        order = np.argsort(rows, kind='stable')
+        return rows[order], distances[order]
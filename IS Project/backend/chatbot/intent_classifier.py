@@ -1,6 +1,7 @@
-from sentence_transformers import SentenceTransformer
 import joblib
 import os
+from chatbot.embedding_cache import embedding_cache
+from chatbot.embedding_runtime import get_runtime
 
 MODEL_PATH = os.path.join(os.path.dirname(__file__), "intent_clf.pkl")
 
@@ -8,9 +9,11 @@ class IntentClassifier:
     def __init__(self):
         # Load saved model
         saved = joblib.load(MODEL_PATH)
-        self.model = SentenceTransformer(saved["model_name"])
+        self.model_name = saved["model_name"]
+        # Same process-wide model instance as the recommender when the names match
+        self.model = get_runtime(self.model_name)
         self.clf = saved["clf"]
 
     def predict(self, text: str) -> str:
-        emb = self.model.encode([text])
+        emb = embedding_cache.encode(self.model, self.model_name, [text])
         return self.clf.predict(emb)[0]
\ No newline at end of file
@@ -0,0 +1,196 @@
+import os
+import threading
+import time
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+from chatbot.embedding_batcher import Histogram
+from chatbot.token_index import tokenize
+
+# Fast-tier confidence needed to skip the embedding model + classifier
+FAST_PATH_THRESHOLD = float(os.getenv("INTENT_FAST_PATH_THRESHOLD", "0.7"))
+# When two intents match, the winner must lead by this much (unless it is a rule)
+MIN_MARGIN = float(os.getenv("INTENT_MIN_MARGIN", "0.3"))
+RULE_WEIGHT = 1.0
+RECENT_DECISIONS = 200
+
+RECOMMEND = "recommend_activity"
+HEALTH = "health_qa"
+CHITCHAT = "chitchat"
+
+# (phrase, weight) per intent. Weight RULE_WEIGHT is a rule: the intent wins whatever
+# else the message mentions (the explicit recommendation keywords keep their
+# old "highest priority" behaviour).
+INTENT_PATTERNS: Dict[str, List[Tuple[str, float]]] = {
+    RECOMMEND: [
+        *((w, RULE_WEIGHT) for w in (
+            "recommend", "recommends", "recommended", "recommending", "recommendation", "recommendations",
+            "suggest", "suggests", "suggested", "suggesting", "suggestion", "suggestions", "activity",
+        )),
+        *((p, 0.8) for p in (
+            "activities", "things to do", "something to do", "what can i do", "i want to do", "i want to go",
+            "i want to join", "interest group", "interest groups", "classes", "courses", "events",
+            "workshop", "workshops",
+            # Singular class/course/event only inside phrases ("of course" is not a request)
+            "a class", "any class", "cooking class", "exercise class", "fitness class", "dance class",
+            "art class", "music class", "a course", "any course", "an event", "any event",
+        )),
+    ],
+    HEALTH: [
+        *((p, 0.85) for p in (
+            "blood pressure", "hypertension", "diabetes", "diabetic", "cholesterol", "heart rate", "blood oxygen",
+            "blood sugar", "glucose", "spo2", "symptom", "symptoms", "medication", "medicine", "dementia",
+            "arthritis", "osteoporosis", "stroke", "dizzy", "dizziness", "insomnia", "nutrition", "diet",
+        )),
+        *((p, 0.6) for p in ("health", "healthy", "pain", "sleep", "doctor", "illness", "disease")),
+    ],
+    CHITCHAT: [
+        *((p, 0.95) for p in (
+            "hello", "hi", "hey", "hi there", "hello there", "good morning", "good afternoon", "good evening",
+            "thank you", "thanks", "thank you very much", "thank you so much", "thanks a lot", "ok thanks",
+            "bye", "goodbye", "see you", "see you later", "how are you", "who are you", "what's your name",
+            "what is your name", "nice to meet you",
+        )),
+    ],
+}
+
+# Intents that only apply when their phrases make up the whole message:
+# "hi" is chitchat, "hi, i want to do yoga" is not
+WHOLE_MESSAGE_INTENTS = {CHITCHAT}
+# Tie-break order when two intents score the same
+PRIORITY = [RECOMMEND, HEALTH, CHITCHAT]
+
+
+class PhraseMatcher:
+    """
+    Trie over normalized token sequences (the word-level equivalent of
+    Aho-Corasick for chat-length messages): every phrase occurrence is
+    found in one pass over the tokens, with no regex or substring scans.
+    """
+
+    def __init__(self):
+        self.root = {}
+
+    def add(self, phrase: str, intent: str, weight: float):
+        node = self.root
+        for token in tokenize(phrase):
+            node = node.setdefault(token, {})
+        node[None] = (phrase, intent, weight)
+
+    def find(self, tokens: List[str]) -> List[Tuple[int, int, str, str, float]]:
+        """(start, end, phrase, intent, weight) for every phrase occurrence in `tokens`."""
+        matches = []
+        for start in range(len(tokens)):
+            node = self.root
+            for end in range(start, len(tokens)):
+                node = node.get(tokens[end])
+                if node is None:
+                    break
+                if None in node:
+                    matches.append((start, end + 1, *node[None]))
+        return matches
+
+
+def build_matcher(patterns: Dict[str, List[Tuple[str, float]]] = INTENT_PATTERNS) -> PhraseMatcher:
+    matcher = PhraseMatcher()
+    for intent, phrases in patterns.items():
+        for phrase, weight in phrases:
+            matcher.add(phrase, intent, weight)
+    return matcher
+
+
+@dataclass
+class RouteDecision:
+    intent: Optional[str]
+    confidence: float
+    tier: str  # "fast" (phrase matcher) or "model" (embedding + classifier)
+    matched: List[str] = field(default_factory=list)
+    seconds: float = 0.0
+
+
+class IntentRouter:
+    """
+    Tiered intent routing for the chat endpoint.
+
+    Tier 1 scores each intent by its strongest matched phrase (whole-message
+    intents are scaled by how much of the message their phrases cover). When
+    several intents match, the winner is only trusted if it is a rule or leads
+    the runner-up by `MIN_MARGIN`. Only when the resulting confidence is
+    below `threshold` is the fallback (the MiniLM + LogisticRegression
+    classifier) called. Every decision is counted so the fast-tier hit rate
+    can be read from stats().
+    """
+
+    def __init__(self, threshold: float = FAST_PATH_THRESHOLD, matcher: Optional[PhraseMatcher] = None):
+        self.threshold = threshold
+        self.matcher = matcher or build_matcher()
+        self._lock = threading.Lock()
+        self.tiers = Counter()
+        self.intents = Counter()
+        self.latency_ms = {"fast": Histogram([0.05, 0.1, 0.5, 1, 5]), "model": Histogram([5, 10, 20, 50, 100, 500])}
+        self.recent = deque(maxlen=RECENT_DECISIONS)
+
+    def score(self, text: str) -> RouteDecision:
+        """Fast-tier decision only (intent None if nothing matched)."""
+        tokens = tokenize(text)
+        matches = self.matcher.find(tokens)
+        if not matches:
+            return RouteDecision(None, 0.0, "fast")
+
+        scores, covered = {}, {}
+        for start, end, _, intent, weight in matches:
+            scores[intent] = max(scores.get(intent, 0.0), weight)
+            covered.setdefault(intent, set()).update(range(start, end))
+        for intent in WHOLE_MESSAGE_INTENTS & scores.keys():
+            scores[intent] *= len(covered[intent]) / len(tokens)
+
+        ranked = sorted(scores, key=lambda i: (-scores[i], PRIORITY.index(i)))
+        best = scores[ranked[0]]
+        runner_up = scores[ranked[1]] if len(ranked) > 1 else 0.0
+        if best >= RULE_WEIGHT or best - runner_up >= MIN_MARGIN:
+            confidence = best
+        else:
+            # Mixed message ("a nutrition workshop"): too close to call, leave it to the classifier
+            confidence = best - runner_up
+        matched = [phrase for _, _, phrase, intent, _ in matches if intent == ranked[0]]
+        return RouteDecision(ranked[0], round(confidence, 3), "fast", matched)
+
+    def route(self, text: str, fallback: Callable[[], str]) -> RouteDecision:
+        """Fast-tier intent if confident, otherwise `fallback()` (the ML classifier)."""
+        start = time.perf_counter()
+        decision = self.score(text)
+        if decision.intent is None or decision.confidence < self.threshold:
+            decision = RouteDecision(fallback(), decision.confidence, "model", decision.matched)
+        decision.seconds = time.perf_counter() - start
+        self._record(decision)
+        print(f"[intent] {decision.tier}: {decision.intent} (confidence {decision.confidence:.2f}, "
+              f"matched {decision.matched}) in {decision.seconds * 1000:.1f}ms")
+        return decision
+
+    def _record(self, decision: RouteDecision):
+        with self._lock:
+            self.tiers[decision.tier] += 1
+            self.intents[f"{decision.tier}:{decision.intent}"] += 1
+            self.latency_ms[decision.tier].observe(decision.seconds * 1000)
+            self.recent.append({
+                "tier": decision.tier, "intent": decision.intent, "confidence": decision.confidence,
+                "matched": decision.matched, "ms": round(decision.seconds * 1000, 3),
+            })
+
+    def stats(self) -> Dict:
+        with self._lock:
+            total = sum(self.tiers.values())
+            return {
+                "threshold": self.threshold,
+                "decisions": total,
+                "fast": self.tiers["fast"],
+                "model": self.tiers["model"],
+                "fast_hit_ratio": round(self.tiers["fast"] / total, 4) if total else 0.0,
+                "intents": dict(self.intents),
+                "latency_ms": {tier: h.snapshot() for tier, h in self.latency_ms.items()},
+                "recent": list(self.recent),
+            }
+
+
+# Module-level singleton used by the chat service
+intent_router = IntentRouter()
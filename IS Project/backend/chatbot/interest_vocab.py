@@ -0,0 +1,92 @@
+import os
+import re
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import pandas as pd
+from chatbot.catalog_bundle import BUNDLE_DIR
+from chatbot.embedding_cache import normalize_text
+
+VOCAB_FILE = 'interest_vocab.npz'
+
+# Interests seniors commonly ask for; catalog categories and subcategories are added at build time
+INTEREST_VOCABULARY = [
+    "tai chi", "qigong", "yoga", "pilates", "stretching", "exercise", "fitness", "gym",
+    "strength training", "aerobics", "zumba", "dance", "line dance", "ballroom dance",
+    "walking", "brisk walking", "hiking", "jogging", "cycling", "swimming", "badminton",
+    "table tennis", "pickleball", "bowling", "golf", "cooking", "baking", "nutrition",
+    "gardening", "music", "singing", "karaoke", "choir", "guitar", "ukulele", "piano",
+    "drums", "art", "painting", "drawing", "calligraphy", "watercolour", "crafts",
+    "knitting", "crochet", "sewing", "pottery", "photography", "reading", "book club",
+    "writing", "storytelling", "language", "english", "mandarin", "malay", "tamil",
+    "computer", "smartphone", "digital skills", "technology", "mahjong", "chess",
+    "board games", "bingo", "meditation", "mindfulness", "health talk", "health screening",
+    "first aid", "volunteering", "social", "outings", "heritage", "festival", "movies",
+    "flower arrangement", "massage", "wellness", "finance", "opera", "drama", "community",
+]
+
+CATEGORY_SEPARATORS = re.compile(r'[_/(),&]+')  # "Music _ Vocal (Karaoke Singing)"
+
+
+def vocabulary_key(term) -> str:
+    """Lookup form of a vocabulary term or user interest."""
+    return normalize_text(str(term).replace('_', ' '))
+
+
+def vocabulary_terms(categories: Iterable = ()) -> List[str]:
+    """Curated interests plus each catalog (sub)category and its parts, normalized and de-duplicated."""
+    terms = list(INTEREST_VOCABULARY)
+    for value in categories:
+        if pd.isna(value):
+            continue
+        terms.append(str(value))
+        terms.extend(CATEGORY_SEPARATORS.split(str(value)))
+
+    seen, keys = set(), []
+    for term in terms:
+        key = vocabulary_key(term)
+        if key and key not in seen:
+            seen.add(key)
+            keys.append(key)
+    return keys
+
+
+class InterestVocabulary:
+    """Precomputed embeddings for common interest phrases, keyed by vocabulary_key()."""
+
+    def __init__(self, terms: List[str], vectors: np.ndarray, model_name: str):
+        self.model_name = model_name
+        self.vectors = np.asarray(vectors, dtype=np.float32)
+        self.vectors.flags.writeable = False
+        self.index = {term: i for i, term in enumerate(terms)}
+
+    def __len__(self):
+        return len(self.index)
+
+    def get(self, text) -> Optional[np.ndarray]:
+        i = self.index.get(vocabulary_key(text))
+        return self.vectors[i] if i is not None else None
+
+
+# -----------------------------
+# Build (data pipeline side) / load (serving side)
+# -----------------------------
+def build_interest_vocab(model, model_name: str, categories: Iterable = (), bundle_dir: str = BUNDLE_DIR) -> Dict:
+    """Embed the vocabulary once and store it next to the catalog vectors."""
+    terms = vocabulary_terms(categories)
+    vectors = np.asarray(model.encode(terms), dtype=np.float32)
+
+    os.makedirs(bundle_dir, exist_ok=True)
+    path = os.path.join(bundle_dir, VOCAB_FILE)
+    with open(path + '.tmp', 'wb') as f:
+        np.savez(f, terms=np.array(terms), vectors=vectors, model_name=np.array(model_name))
+    os.replace(path + '.tmp', path)
+    return {"path": path, "terms": len(terms), "dim": int(vectors.shape[1])}
+
+
+def load_interest_vocab(bundle_dir: str = BUNDLE_DIR) -> Optional[InterestVocabulary]:
+    """Load the vocabulary table if the pipeline has published one."""
+    path = os.path.join(bundle_dir, VOCAB_FILE)
+    if not os.path.exists(path):
+        return None
+    with np.load(path, allow_pickle=False) as data:
+        return InterestVocabulary(data['terms'].tolist(), data['vectors'], str(data['model_name']))
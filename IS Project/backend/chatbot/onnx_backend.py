@@ -0,0 +1,119 @@
+import json
+import os
+import numpy as np
+
+BASE_DIR = os.path.dirname(__file__)
+ONNX_DIR = os.getenv("EMBEDDING_ONNX_DIR", os.path.join(BASE_DIR, '..', 'models', 'onnx'))
+QUANTIZATION_CONFIG = os.getenv("EMBEDDING_QUANTIZATION", "avx512_vnni")  # arm64 | avx2 | avx512 | avx512_vnni
+
+FP32_FILE = os.path.join('onnx', 'model.onnx')
+
+
+def model_dir(model_name: str, onnx_dir: str = ONNX_DIR) -> str:
+    return os.path.join(onnx_dir, model_name.replace('/', '__'))
+
+
+def quantized_file(path: str, config: str = QUANTIZATION_CONFIG) -> str:
+    """int8 graph written by export_dynamic_quantized_onnx_model (qint8 or quint8 depending on the target)."""
+    for dtype in ('qint8', 'quint8'):
+        name = os.path.join('onnx', f'model_{dtype}_{config}.onnx')
+        if os.path.exists(os.path.join(path, name)):
+            return name
+    return os.path.join('onnx', f'model_qint8_{config}.onnx')
+
+
+# -----------------------------
+# Export (offline, needs torch + optimum)
+# -----------------------------
+def export_onnx_model(model_name: str, onnx_dir: str = ONNX_DIR, quantize: bool = True,
+                      config: str = QUANTIZATION_CONFIG) -> str:
+    """
+    Export a SentenceTransformer to ONNX (plus a dynamic int8 copy) together with
+    its tokenizer and pooling config, so serving needs only onnxruntime + tokenizers.
+    """
+    from sentence_transformers import SentenceTransformer, export_dynamic_quantized_onnx_model
+
+    out_dir = model_dir(model_name, onnx_dir)
+    model = SentenceTransformer(model_name, backend="onnx")
+    model.save_pretrained(out_dir)
+    if quantize:
+        export_dynamic_quantized_onnx_model(model, config, out_dir)
+    return out_dir
+
+
+# -----------------------------
+# Serving (torch-free)
+# -----------------------------
+class OnnxEncoder:
+    """
+    SentenceTransformer-compatible encoder on onnxruntime: tokenizer.json for
+    tokenization, the exported transformer graph, then the model's own mean
+    pooling and (if configured) L2 normalization in numpy. No torch import.
+    """
+
+    def __init__(self, path: str, file_name: str = FP32_FILE, threads: int = 0):
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        modules = self._read_json(path, 'modules.json') or []
+        module_types = [m.get('type', '') for m in modules]
+        pooling = self._read_json(path, os.path.join('1_Pooling', 'config.json')) or {'pooling_mode': 'mean'}
+        if not (pooling.get('pooling_mode_mean_tokens') or pooling.get('pooling_mode') == 'mean'):
+            raise ValueError(f"{path}: only mean pooling is supported by the ONNX backend")
+        self.normalize = any(t.endswith('Normalize') for t in module_types)
+
+        st_config = self._read_json(path, 'sentence_bert_config.json') or {}
+        self.max_length = int(st_config.get('max_seq_length', 256))
+        self.tokenizer = Tokenizer.from_file(os.path.join(path, 'tokenizer.json'))
+        self.tokenizer.enable_truncation(self.max_length)
+        self.tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        if threads:
+            options.intra_op_num_threads = threads
+        self.session = ort.InferenceSession(os.path.join(path, file_name), options,
+                                            providers=['CPUExecutionProvider'])
+        self.input_names = {i.name for i in self.session.get_inputs()}
+        self.path = path
+        self.file_name = file_name
+
+    @staticmethod
+    def _read_json(path, name):
+        full = os.path.join(path, name)
+        if not os.path.exists(full):
+            return None
+        with open(full, encoding='utf-8') as f:
+            return json.load(f)
+
+    def encode(self, sentences, batch_size: int = 32, **_ignored) -> np.ndarray:
+        """Embeddings as float32 [len(sentences), dim]; extra SentenceTransformer kwargs are ignored."""
+        if isinstance(sentences, str):
+            sentences = [sentences]
+        outputs = []
+        for start in range(0, len(sentences), batch_size):
+            encodings = self.tokenizer.encode_batch(list(sentences[start:start + batch_size]))
+            ids = np.array([e.ids for e in encodings], dtype=np.int64)
+            mask = np.array([e.attention_mask for e in encodings], dtype=np.int64)
+            feeds = {'input_ids': ids, 'attention_mask': mask}
+            if 'token_type_ids' in self.input_names:
+                feeds['token_type_ids'] = np.array([e.type_ids for e in encodings], dtype=np.int64)
+            tokens = self.session.run(None, feeds)[0]
+
+            # Mean pooling over real (non-padding) tokens
+            weights = mask[..., None].astype(np.float32)
+            pooled = (tokens * weights).sum(axis=1) / np.clip(weights.sum(axis=1), 1e-9, None)
+            if self.normalize:
+                pooled /= np.clip(np.linalg.norm(pooled, axis=1, keepdims=True), 1e-12, None)
+            outputs.append(pooled.astype(np.float32))
+        if not outputs:
+            return np.empty((0, 0), dtype=np.float32)
+        return np.concatenate(outputs)
+
+
+def load_onnx_encoder(model_name: str, quantized: bool = False, onnx_dir: str = ONNX_DIR) -> OnnxEncoder:
+    """Load an exported model; raises FileNotFoundError if it has not been exported yet."""
+    path = model_dir(model_name, onnx_dir)
+    file_name = quantized_file(path) if quantized else FP32_FILE
+    if not os.path.exists(os.path.join(path, file_name)):
+        raise FileNotFoundError(f"{os.path.join(path, file_name)} not found; run data/export_onnx.py first")
+    return OnnxEncoder(path, file_name)
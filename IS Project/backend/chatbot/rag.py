@@ -1,10 +1,12 @@
-from langchain_pinecone import PineconeVectorStore
-from langchain.chains.question_answering import load_qa_chain
-from chatbot.rag_utils import DoubaoEmbeddings, LLM
+from chatbot.rag_utils import DoubaoEmbeddings, get_llm
 
 index_name = "health-knowledge-vector"
 
 def rag_answer(query: str, top_k: int = 3) -> str:
+    # LangChain / Pinecone are imported on the first question, not at startup
+    from langchain_pinecone import PineconeVectorStore
+    from langchain.chains.question_answering import load_qa_chain
+
     embeddings = DoubaoEmbeddings()
     vectorstore = PineconeVectorStore(index_name=index_name, embedding=embeddings)
 
@@ -19,7 +21,7 @@ def rag_answer(query: str, top_k: int = 3) -> str:
         docs.append(doc)
 
     # 2. Use LangChain's QA Chain
-    llm = LLM
+    llm = get_llm()
     qa_chain = load_qa_chain(llm, chain_type="stuff")
 
     # 3. Run QA chain
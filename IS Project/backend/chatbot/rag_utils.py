@@ -1,25 +1,47 @@
 import os
-from pinecone import Pinecone
+from functools import lru_cache
 from dotenv import load_dotenv
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
 from openai import OpenAI
 
 load_dotenv()
 
-# ---------------- Init Pinecone ----------------
-pc = Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
 INDEX_NAME = "health-knowledge-vector"
 
 embeddingModel = "doubao-embedding-text-240715"
 llmModel = "deepseek-v3-1-250821"
 
-Embeddings = OpenAIEmbeddings(
-    model=embeddingModel
-)
 
-LLM = ChatOpenAI(
-    model=llmModel
-)
+# ---------------- Lazy clients ----------------
+# Created on first use so importing the chatbot (and starting the API) does not
+# pay for the Pinecone / LangChain imports and client setup.
+@lru_cache(maxsize=None)
+def get_pinecone():
+    from pinecone import Pinecone
+
+    return Pinecone(api_key=os.getenv("PINECONE_API_KEY"))
+
+
+@lru_cache(maxsize=None)
+def get_embeddings():
+    from langchain_openai import OpenAIEmbeddings
+
+    return OpenAIEmbeddings(model=embeddingModel)
+
+
+@lru_cache(maxsize=None)
+def get_llm():
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(model=llmModel)
+
+
+def __getattr__(name):
+    # Backwards-compatible module attributes (pc, Embeddings, LLM)
+    getters = {"pc": get_pinecone, "Embeddings": get_embeddings, "LLM": get_llm}
+    if name in getters:
+        return getters[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 class DoubaoEmbeddings:
     def __init__(self):
@@ -34,4 +56,4 @@ class DoubaoEmbeddings:
         return [d.embedding for d in resp.data]
 
     def embed_query(self, text):
-        return self.embed_documents([text])[0]
\ No newline at end of file
+        return self.embed_documents([text])[0]
@@ -1,137 +1,122 @@
 import pandas as pd
 import numpy as np
-import re
-import os
-from sentence_transformers import SentenceTransformer
-from sklearn.metrics.pairwise import cosine_similarity
-from haversine import haversine
+from chatbot.activity_catalog import get_catalog
+from chatbot.embedding_cache import embedding_cache
+from chatbot.embedding_runtime import get_runtime
 
-MODEL = SentenceTransformer('all-MiniLM-L6-v2')  
+MODEL_NAME = 'all-MiniLM-L6-v2'
+MODEL = get_runtime(MODEL_NAME)  # shared with the intent classifier; weights load on first use
+
+BATCH_CHUNK_SIZE = 256  # profiles per encode + matmul in recommend_many
 
 # -----------------------------
 # Language filter
 # -----------------------------
-def language_filter(df, user_languages):
+def language_filter(snapshot, user_languages):
+    """Boolean mask over catalog rows offered in any of the user's languages."""
     if isinstance(user_languages, str):
         user_languages = [user_languages]  # Normalize to list
-    user_languages = [lang.lower().strip() for lang in user_languages]
-
-    def check_lang(activity_lang):
-        if pd.isna(activity_lang):
-            return False
-        langs = re.split(r'[,/;| ]+', str(activity_lang).lower())
-        langs = [l.strip() for l in langs if l.strip()]
-        return any(user_lang in langs for user_lang in user_languages)
-
-    return df[df['language'].apply(check_lang)]
+    return snapshot.languages.match(user_languages)
 
 
 # -----------------------------
 # Time slot penalty function
 # -----------------------------
-def time_slot_penalty(activity_slot, user_time_slots):
-    if pd.isna(activity_slot):
-        return 0.5  # Unknown time slot, penalty 0.5
-    if activity_slot.lower() in [slot.lower() for slot in user_time_slots]:
-        return 0   # Match → no penalty
-    return 1       # Mismatch → penalty 1
+def time_slot_penalty(snapshot, rows, user_time_slots):
+    """Penalty per row, looked up by slot code: 0 if the slot matches, 1 on mismatch, 0.5 if unknown."""
+    slots = snapshot.time_slots
+    table = slots.lookup_table(user_time_slots, hit=0, miss=1, missing=0.5)
+    return table[slots.codes[rows]]
 
 
 # -----------------------------
 # Multi-rule filtering
 # -----------------------------
-def multi_rule_filter(df, user_languages, user_budget, user_time_slots, user_lat, user_lon, max_distance=50):
+def multi_rule_filter(snapshot, candidates, user_languages, user_budget, user_time_slots,
+                      user_lat, user_lon, max_distance=50):
+    """
+    candidates: boolean mask over catalog rows left by earlier filters (e.g. source type).
+    Returns the row ids that pass and their distances (km).
+    """
     # Step 1: Language filter
-    df = language_filter(df, user_languages)
+    candidates = candidates & language_filter(snapshot, user_languages)
 
-    # Step 2: Geographic filter
-    user_coords = (user_lat, user_lon)
-    distances = []
-    for lat, lon in zip(df['lat'], df['lon']):
-        try:
-            dist = haversine(user_coords, (lat, lon))  # unit: km
-            distances.append(dist)
-        except:
-            distances.append(float('inf'))
-    df = df.copy()
-    df.loc[:, 'distance'] = distances
-    df = df[df['distance'] <= max_distance]
+    # Step 2: Geographic filter: radius query on the community-club spatial index
+    rows, distances = snapshot.spatial_index.query_radius(user_lat, user_lon, max_distance)
+    keep = candidates[rows]
 
-    # Step 3: Time slot penalty
-    df['is_wrong_time_slot'] = df['time_slot'].apply(lambda x: time_slot_penalty(x, user_time_slots))
-
-    return df
+    return rows[keep], distances[keep]
 
 
 # -----------------------------
-# Embedding utilities
+# Interest similarity
 # -----------------------------
-def generate_vectors(texts, model):
-    return model.encode(texts)
+def interest_similarity(snapshot, rows, user_vector):
+    """
+    Cosine similarity between the user vector and the given catalog rows.
+    Catalog vectors are L2-normalized at load, so this is a single matrix-vector product.
+    """
+    user_vector = np.asarray(user_vector, dtype=np.float32)
+    norm = np.linalg.norm(user_vector)
+    if norm == 0:
+        return np.zeros(len(rows), dtype=np.float32)
+    return snapshot.vectors[rows] @ (user_vector / norm)
 
 
-def enhance_with_keywords(text, keywords, weight=3):
-    words = text.split()
-    for keyword in keywords:
-        if keyword.lower() not in [w.lower() for w in words]:
-            words.extend([keyword] * weight)
-    return ' '.join(words)
+# -----------------------------
+# Keyword match bonus
+# -----------------------------
+def keyword_match_bonus(snapshot, rows, user_interests):
+    """
+    Bonus per row from the inverted title/description indexes: +0.25 per interest
+    found in the title, else +0.15 if found in the description, capped at 0.4.
+    """
+    bonus = np.zeros(len(snapshot.df))
+    for kw in user_interests:
+        kw = kw.lower().strip()
+        # Title completely matches (directly hits the keyword)
+        title_hits = snapshot.title_index.lookup(kw)
+        bonus[title_hits] += 0.25
+        # Description contains
+        desc_hits = np.setdiff1d(snapshot.description_index.lookup(kw), title_hits, assume_unique=True)
+        bonus[desc_hits] += 0.15
+    return np.minimum(bonus[rows], 0.4)  # Limit the maximum bonus to 0.4, avoid too high
 
 
 # -----------------------------
 # Composite scoring function
 # -----------------------------
-def comprehensive_score(df, user_vector, user_budget, user_need_free, user_interests,
+def comprehensive_score(similarity, keyword_bonus, distance, price, is_free, wrong_time_slot,
+                        user_budget, user_need_free,
                         alpha=0.55, beta=0.15, gamma=0.1, delta=0.2):
-    if len(df) == 0:
-        return df
-
-    # InterestScore match
-    activity_vectors = np.stack(df['activity_vector'].values)
-    df['InterestScore'] = cosine_similarity([user_vector], activity_vectors)[0]
-
-    # -------- Keyword-based enhancements --------
-    def keyword_match_bonus(row):
-        title = str(row['title']).lower()
-        desc = str(row['description']).lower()
-        bonus = 0.0
-        for kw in user_interests:
-            kw = kw.lower().strip()
-            # Title completely matches (directly hits the keyword)
-            if re.search(rf'\b{re.escape(kw)}\b', title):
-                bonus += 0.25
-            # Description contains
-            elif kw in desc:
-                bonus += 0.15
-        return min(bonus, 0.4)  # Limit the maximum bonus to 0.4, avoid too high
-
-    df['KeywordBonus'] = df.apply(keyword_match_bonus, axis=1)
-    df['InterestScore'] = (df['InterestScore'] + df['KeywordBonus']).clip(0, 1)
-
-    # Smoothly amplify high interest range
-    df['InterestScore'] = np.sqrt(df['InterestScore'])
+    """
+    Composite score as pure array expressions; every input is row-aligned.
+    Returns (score, InterestScore).
+    """
+    # InterestScore match + keyword-based enhancement, smoothly amplify high interest range
+    interest = np.sqrt(np.clip(similarity + keyword_bonus, 0, 1))
 
     # Distance penalty
     max_dist = 50
-    df['normalized_distance'] = df['distance'].apply(lambda x: min(x / max_dist, 1.0))
-    df['distance_penalty'] = 0.5 * df['normalized_distance'] + 0.5 * (df['normalized_distance'] ** 2)
+    normalized_distance = np.minimum(distance / max_dist, 1.0)
+    distance_penalty = 0.5 * normalized_distance + 0.5 * (normalized_distance ** 2)
 
     # Price penalty
-    df['price_penalty'] = np.clip((df['price_num'] - user_budget) / user_budget, 0, 1)
+    price_penalty = np.clip((price - user_budget) / user_budget, 0, 1)
 
     # Free activity preference bonus
-    df['free_bonus'] = df['is_free'].apply(lambda x: 0.1 if (user_need_free and x == 1) else 0)
+    free_bonus = np.where(user_need_free & (is_free == 1), 0.1, 0)
 
     # Composite score
-    df['score'] = (
-        alpha * df['InterestScore']
-        - beta * df['price_penalty']
-        - gamma * df['is_wrong_time_slot']
-        - delta * df['distance_penalty']
-        + df['free_bonus']
+    score = (
+        alpha * interest
+        - beta * price_penalty
+        - gamma * wrong_time_slot
+        - delta * distance_penalty
+        + free_bonus
     )
 
-    return df
+    return score, interest
 
 def normalize_score(series, temperature=2.0):
     s = pd.Series(series, dtype=float)
@@ -144,45 +129,122 @@ def normalize_score(series, temperature=2.0):
     z = (s - mu) / (sigma * temperature)
     return 1 / (1 + np.exp(-z))
 
+# -----------------------------
+# Top-K selection
+# -----------------------------
+def top_positions(key, count):
+    """Positions of the `count` largest keys, best first (ties keep row order). NaN ranks last."""
+    n = len(key)
+    count = min(count, n)
+    if count <= 0:
+        return np.empty(0, dtype=np.int64)
+    neg = -np.asarray(key, dtype=float)
+    if count < n:
+        kth = neg[np.argpartition(neg, count - 1)[count - 1]]
+        # Everything strictly better than the count-th key, then its ties in row order
+        if np.isnan(kth):
+            better, ties = np.flatnonzero(~np.isnan(neg)), np.flatnonzero(np.isnan(neg))
+        else:
+            better, ties = np.flatnonzero(neg < kth), np.flatnonzero(neg == kth)
+        window = np.concatenate([better, ties[:count - len(better)]])
+    else:
+        window = np.arange(n)
+    return window[np.lexsort((window, neg[window]))]
+
+
+def select_top_k(scores, interest, titles, k=3, interest_threshold=0.6):
+    """
+    Positions of the final top-k rows, best first.
+
+    Rows whose InterestScore reaches the threshold rank ahead of the rest; duplicate
+    titles keep only their best row and their slots are refilled by score. Only a
+    small candidate window around the top is ever partitioned and sorted.
+    """
+    scores = np.asarray(scores, dtype=float)
+    relevant = np.asarray(interest) >= interest_threshold
+
+    # Lift relevant rows above every non-relevant score. NaN scores rank last
+    # within their group, so they are placed just below the finite minimum first.
+    finite = scores[np.isfinite(scores)]
+    floor = (finite.min() - 1.0) if len(finite) else 0.0
+    lift = (finite.max() - floor + 1.0) if len(finite) else 1.0
+    head = top_positions(np.where(np.isnan(scores), floor, scores) + lift * relevant, k)
+
+    picked, seen = [], set()
+    for pos in head:
+        if titles[pos] not in seen:
+            seen.add(titles[pos])
+            picked.append(pos)
+
+    # Refill slots freed by duplicate titles with the best remaining rows by score
+    window = 4 * k
+    while len(picked) < k:
+        ranked = top_positions(scores, window)
+        for pos in ranked:
+            if len(picked) >= k:
+                break
+            if titles[pos] not in seen:
+                seen.add(titles[pos])
+                picked.append(pos)
+        if len(ranked) == len(scores):
+            break
+        window *= 4
+
+    return np.array(picked, dtype=np.int64)
+
+
+# Explanation phrases, filled in for the final top-K rows only
+EXPLANATION_TEMPLATES = {
+    "interest_keywords": "strongly matches your interest in {keywords}",
+    "interest_high": "is highly relevant to your interests",
+    "interest_match": "matches your interests",
+    "interest_some": "is somewhat related to your interests",
+    "free_preferred": "is free, perfectly fitting your preference for free activities",
+    "free": "is free to join",
+    "within_budget": "is within your budget (SGD {price:.2f})",
+    "above_budget": "is slightly above your budget (SGD {price:.2f})",
+    "very_close": "is very close to your location",
+    "near": "is reasonably near you",
+    "far": "is a bit farther but still accessible",
+    "time_slot": "matches your preferred time slot",
+}
+
+
 def explain_recommendation(row, user_interests, user_budget, user_need_free,
                            user_provided_budget=True, user_provided_time_slots=True):
+    t = EXPLANATION_TEMPLATES
     reasons = []
 
     # InterestScore
     if row['InterestScore'] >= 0.85:
-        matched_kw = [kw for kw in user_interests if kw.lower() in row['title'].lower() or kw.lower() in str(row['description']).lower()]
+        matched_kw = [kw for kw in user_interests if kw.lower() in str(row['title']).lower() or kw.lower() in str(row['description']).lower()]
         if matched_kw:
-            reasons.append(f"strongly matches your interest in {', '.join(matched_kw)}")
+            reasons.append(t["interest_keywords"].format(keywords=', '.join(matched_kw)))
         else:
-            reasons.append("is highly relevant to your interests")
+            reasons.append(t["interest_high"])
     elif row['InterestScore'] >= 0.7:
-        reasons.append("matches your interests")
+        reasons.append(t["interest_match"])
     else:
-        reasons.append("is somewhat related to your interests")
+        reasons.append(t["interest_some"])
 
     # Price and Budget
     if row['is_free'] == 1:
-        if user_need_free:
-            reasons.append("is free, perfectly fitting your preference for free activities")
-        else:
-            reasons.append("is free to join")
+        reasons.append(t["free_preferred"] if user_need_free else t["free"])
     elif user_provided_budget:
-        if row['price_num'] <= user_budget:
-            reasons.append(f"is within your budget (SGD {row['price_num']:.2f})")
-        else:
-            reasons.append(f"is slightly above your budget (SGD {row['price_num']:.2f})")
+        key = "within_budget" if row['price_num'] <= user_budget else "above_budget"
+        reasons.append(t[key].format(price=row['price_num']))
 
     # Distance
     if row['distance'] <= 2:
-        reasons.append("is very close to your location")
+        reasons.append(t["very_close"])
     elif row['distance'] <= 8:
-        reasons.append("is reasonably near you")
+        reasons.append(t["near"])
     else:
-        reasons.append("is a bit farther but still accessible")
+        reasons.append(t["far"])
 
     # Time slot
     if user_provided_time_slots and row['is_wrong_time_slot'] == 0:
-        reasons.append("matches your preferred time slot")
+        reasons.append(t["time_slot"])
 
     explanation = (
         f"This activity {', '.join(reasons)}. "
@@ -190,17 +252,16 @@ def explain_recommendation(row, user_interests, user_budget, user_need_free,
     return explanation
 
 # -----------------------------
-# Main function
+# Request preparation: defaults and hard filters
 # -----------------------------
-def main(user_interests, user_languages, user_time_slots,
-         user_budget, user_need_free, user_lat, user_lon, sourcetypes=None):
-    try:
-        base_dir = os.path.dirname(__file__)
-        data_path = os.path.join(base_dir, '..', 'data', 'activities.xlsx')
-        df = pd.read_excel(data_path)
-    except Exception as e:
-        print(f"Failed to read data: {e}")
-        return pd.DataFrame()
+def prepare_request(snapshot, user_interests, user_languages, user_time_slots,
+                    user_budget, user_need_free, user_lat, user_lon, sourcetypes=None):
+    """
+    Apply input defaults and the source-type filter. Returns a plan dict; for
+    requests with interests it also carries the rows passing the language and
+    distance filters (`rows`) and their distances.
+    """
+    df = snapshot.df
 
     # Process defaults for missing inputs
     # 1. Language default to English
@@ -235,140 +296,216 @@ def main(user_interests, user_languages, user_time_slots,
         sourcetypes = None
 
     # Source type filter (default to all if None/empty)
+    candidates = np.ones(len(df), dtype=bool)
     valid_types = {"course", "event", "interest_group"}
     if sourcetypes:
         selected = {s.strip().lower() for s in sourcetypes if isinstance(s, str)}
         selected = selected & valid_types
-        if len(selected) > 0 and 'source_type' in df.columns:
-            df = df[df['source_type'].str.lower().isin(selected)]
-
-    # 7. Interests missing or empty → return random activities
-    user_interests = [i for i in user_interests if i.strip()]
-    if not user_interests or len(user_interests) == 0:
-        print("No user interests provided, returning random activities")
-        random_activities = df.sample(n=min(3, len(df)))
-
-        # Add necessary fields
-        random_activities = random_activities.copy()
-        random_activities['score'] = 0.5  # Random score
-        random_activities['InterestScore'] = 0.5
-        random_activities['remaining'] = random_activities['capacity'] - random_activities['enrolled']
-        
-        # Calculate distances if lat/lon provided
-        if not skip_distance_filter:
-            user_coords = (user_lat, user_lon)
-            distances = []
-            for lat, lon in zip(random_activities['lat'], random_activities['lon']):
-                try:
-                    dist = haversine(user_coords, (lat, lon))
-                    distances.append(dist)
-                except:
-                    distances.append(float('inf'))
-            random_activities['distance'] = distances
-        else:
-            random_activities['distance'] = 0.0
-        
-        # Add score_normalized and explanation for random activities
-        random_activities['score_normalized'] = 0.5  # Random normalized score
-        random_activities['explanation'] = "This is a randomly selected activity for you to explore."
-        
-        return random_activities[['title', 'category', 'description', 'score', 'InterestScore',
-                                  'language', 'distance', 'remaining', 'date',
-                                  'start_time', 'end_time', 'price_num', 'source_type', 'lat', 'lon', 'score_normalized', 'explanation']]
+        if len(selected) > 0 and snapshot.source_types is not None:
+            candidates &= snapshot.source_types.match(selected)
+
+    plan = {
+        "interests": [i for i in user_interests or [] if i.strip()],
+        "languages": user_languages,
+        "time_slots": user_time_slots,
+        "budget": user_budget,
+        "need_free": user_need_free,
+        "provided_budget": user_provided_budget,
+        "provided_time_slots": user_provided_time_slots,
+        "skip_distance_filter": skip_distance_filter,
+        "lat": user_lat,
+        "lon": user_lon,
+        "candidates": candidates,
+        "rows": None,
+        "distances": None,
+    }
+    if not plan["interests"]:
+        return plan
 
     # Multi-rule filtering (Update: skip distance filter if no valid lat/lon)
     if skip_distance_filter:
         # Skip distance filtering
-        df = language_filter(df, user_languages)
-        df['is_wrong_time_slot'] = df['time_slot'].apply(lambda x: time_slot_penalty(x, user_time_slots))
-        df['distance'] = 0.0  # Set distance to 0
+        rows = np.flatnonzero(candidates & language_filter(snapshot, user_languages))
+        distances = np.zeros(len(rows))  # Set distance to 0
+    else:
+        rows, distances = multi_rule_filter(snapshot, candidates, user_languages, user_budget,
+                                            user_time_slots, user_lat, user_lon)
+    plan["rows"] = rows
+    plan["distances"] = distances
+    return plan
+
+
+def restrict_to_candidates(plan, candidate_rows, top_k=3):
+    """
+    Keep only the filtered rows that are also in `candidate_rows` (sorted row ids,
+    e.g. ANN results). If fewer than top_k survive, the plan is left unrestricted.
+    """
+    keep = np.isin(plan["rows"], candidate_rows, assume_unique=True)
+    if keep.sum() >= top_k:
+        plan["rows"] = plan["rows"][keep]
+        plan["distances"] = plan["distances"][keep]
+    return plan
+
+
+def random_activities(snapshot, plan, top_k=3):
+    """Random picks among the source-type candidates, for requests without interests."""
+    print("No user interests provided, returning random activities")
+    candidate_rows = np.flatnonzero(plan["candidates"])
+    rows = np.random.choice(candidate_rows, size=min(top_k, len(candidate_rows)), replace=False)
+    random_activities = snapshot.df.take(rows)
+
+    # Add necessary fields
+    random_activities['score'] = 0.5  # Random score
+    random_activities['InterestScore'] = 0.5
+    random_activities['remaining'] = random_activities['capacity'] - random_activities['enrolled']
+    
+    # Calculate distances if lat/lon provided
+    if not plan["skip_distance_filter"]:
+        random_activities['distance'] = snapshot.spatial_index.distances(plan["lat"], plan["lon"])[rows]
     else:
-        df = multi_rule_filter(df, user_languages, user_budget, user_time_slots, user_lat, user_lon)
+        random_activities['distance'] = 0.0
+    
+    # Add score_normalized and explanation for random activities
+    random_activities['score_normalized'] = 0.5  # Random normalized score
+    random_activities['explanation'] = "This is a randomly selected activity for you to explore."
     
-    if len(df) == 0:
+    return random_activities[['title', 'category', 'description', 'score', 'InterestScore',
+                              'language', 'distance', 'remaining', 'date',
+                              'start_time', 'end_time', 'price_num', 'source_type', 'lat', 'lon', 'score_normalized', 'explanation']]
+
+
+def rank_candidates(snapshot, plan, similarity, top_k=3):
+    """Score the filtered rows of a plan given their interest similarity and build the top-K frame."""
+    rows, distances = plan["rows"], plan["distances"]
+    user_interests, user_budget, user_need_free = plan["interests"], plan["budget"], plan["need_free"]
+
+    wrong_time_slot = time_slot_penalty(snapshot, rows, plan["time_slots"])
+
+    # Compute composite score as array expressions over precomputed catalog columns
+    keyword_bonus = keyword_match_bonus(snapshot, rows, user_interests)
+    score, interest = comprehensive_score(similarity, keyword_bonus, distances,
+                                          snapshot.price[rows], snapshot.is_free[rows], wrong_time_slot,
+                                          user_budget, user_need_free)
+
+    # Top-K: partial selection over the score array
+    interest_threshold = 0.6  # lowered to allow more activities while still prioritizing distance
+    positions = select_top_k(score, interest, snapshot.titles[rows], k=top_k,
+                             interest_threshold=interest_threshold)
+    score_normalized = normalize_score(score).to_numpy()
+
+    # Materialize only the K winners (index = catalog row id)
+    top = snapshot.df.take(rows[positions])
+    top['distance'] = distances[positions]
+    top['is_wrong_time_slot'] = wrong_time_slot[positions]
+    top['score'] = score[positions]
+    top['InterestScore'] = interest[positions]
+    top['score_normalized'] = score_normalized[positions]
+
+    # Add explanation to the final top-K results
+    top['explanation'] = [
+        explain_recommendation(r, user_interests, user_budget, user_need_free,
+                               plan["provided_budget"], plan["provided_time_slots"])
+        for r in top.to_dict('records')
+    ]
+
+    return top[['title', 'category', 'description', 'score', 'InterestScore',
+                'language', 'distance', 'date',
+                'start_time', 'end_time', 'price_num', 'source_type', 'lat', 'lon', 'score_normalized', 'explanation']]
+
+
+# -----------------------------
+# Main function
+# -----------------------------
+def main(user_interests, user_languages, user_time_slots,
+         user_budget, user_need_free, user_lat, user_lon, sourcetypes=None, catalog=None, top_k=3):
+    # Activities (joined with their vectors) come from the resident catalog.
+    # Hold on to one snapshot so a concurrent reload cannot change data mid-request.
+    catalog = catalog or get_catalog()
+    snapshot = catalog.snapshot
+    if snapshot is None:
+        print("Failed to read data: activity catalog is not loaded")
+        return pd.DataFrame()
+
+    plan = prepare_request(snapshot, user_interests, user_languages, user_time_slots,
+                           user_budget, user_need_free, user_lat, user_lon, sourcetypes)
+
+    # 7. Interests missing or empty → return random activities
+    if not plan["interests"]:
+        return random_activities(snapshot, plan, top_k)
+
+    if len(plan["rows"]) == 0:
         print("No activities match after multi-rule filtering")
         return pd.DataFrame()
 
     # Load model
     model = MODEL
 
-    # User interest vector: average multiple interests
-    user_interest_vecs = model.encode(user_interests)
+    # User interest vector: average multiple interests.
+    # Common interests come from the precomputed vocabulary table, others from the cache or the model.
+    user_interest_vecs = embedding_cache.encode(model, MODEL_NAME, plan["interests"],
+                                                vocabulary=snapshot.interest_vocab)
     user_vector = np.mean(user_interest_vecs, axis=0)
 
-    # Generate activity vectors (with weights and safe field handling)
-    activity_texts = []
-    for _, row in df.iterrows():
-        title = str(row['title']) if 'title' in row and pd.notna(row['title']) else ''
-        category = str(row['category']) if 'category' in row and pd.notna(row['category']) else ''
-        subcategory = str(row['subcategory']) if 'subcategory' in row and pd.notna(row['subcategory']) else ''
-        description = str(row['description']) if 'description' in row and pd.notna(row['description']) else ''
-        # requirements = str(row['requirements']) if 'requirements' in row and pd.notna(row['requirements']) else ''
-
-        parts = [
-            (title, 5),
-            (category, 2),
-            (subcategory, 2),
-            (description, 1),
-            # (requirements, 1)
-        ]
-        weighted_parts = []
-        for text, w in parts:
-            if text.strip():
-                weighted_parts.extend([text] * w)
-
-        activity_text = ' '.join(weighted_parts)
-
-        activity_text = enhance_with_keywords(activity_text, user_interests, weight=3)
-        activity_texts.append(activity_text)
-
-    # df['activity_text'] = activity_texts
-    # df['activity_vector'] = list(generate_vectors(df['activity_text'].tolist(), model))
-    base_dir = os.path.dirname(__file__)
-    data_path = os.path.join(base_dir, '..', "data", "activities_with_vec.pkl")
-    df_with_vec = pd.read_pickle(data_path)
-
-    df = df.merge(
-        df_with_vec[['id', 'activity_vector']], 
-        on='id', 
-        how='left'
-    )
+    # Large catalogs: score only the top-M semantic candidates that also pass the filters
+    if snapshot.ann_index is not None:
+        restrict_to_candidates(plan, snapshot.ann_index.search(user_vector), top_k)
 
-    # Compute composite score
-    df = comprehensive_score(df, user_vector, user_budget, user_need_free, user_interests)
-    if len(df) == 0:
-        return pd.DataFrame()
-
-    df = df.sort_values(by='score', ascending=False)
-    df['score_normalized'] = normalize_score(df['score'])
-
-    df['remaining'] = df['capacity'] - df['enrolled']
+    similarity = interest_similarity(snapshot, plan["rows"], user_vector)
+    return rank_candidates(snapshot, plan, similarity, top_k)
 
-    # Interest threshold filtering (lowered to allow more activities while still prioritizing distance)
-    interest_threshold = 0.6
-    relevant_activities = df[df['InterestScore'] >= interest_threshold]
 
-    if len(relevant_activities) < 3:
-        top_3 = pd.concat([relevant_activities, df[df['InterestScore'] < interest_threshold]]).head(3)
-    else:
-        top_3 = relevant_activities.head(3)
-    
-    # Remove duplicates based on title (keep the one with highest score)
-    top_3 = top_3.drop_duplicates(subset=['title'], keep='first')
-    
-    # If we have less than 3 after deduplication, fill with more activities
-    if len(top_3) < 3:
-        remaining_activities = df[~df['title'].isin(top_3['title'])]
-        additional_needed = 3 - len(top_3)
-        if len(remaining_activities) > 0:
-            additional = remaining_activities.head(additional_needed)
-            top_3 = pd.concat([top_3, additional])
-
-    # Add score_normalized and explanation to the final top_3 results
-    top_3['explanation'] = top_3.apply(
-        lambda r: explain_recommendation(r, user_interests, user_budget, user_need_free, user_provided_budget, user_provided_time_slots), axis=1
-    )
-
-    return top_3[['title', 'category', 'description', 'score', 'InterestScore',
-                  'language', 'distance', 'date',
-                  'start_time', 'end_time', 'price_num', 'source_type', 'lat', 'lon', 'score_normalized', 'explanation']]
+# -----------------------------
+# Batch scoring
+# -----------------------------
+def recommend_many(profiles, catalog=None, top_k=3, chunk_size=BATCH_CHUNK_SIZE):
+    """
+    Top-K frames for many profiles (dicts with the recommender's profile keys),
+    yielded one per profile in input order.
+
+    Profiles are processed in chunks of `chunk_size`: every interest in the
+    chunk is embedded in one encode call, and all users are scored against the
+    whole catalog with a single [U, dim] x [dim, N] matmul. Each user's filters
+    then pick their rows out of their similarity row. The batch path always
+    scores exactly; the ANN index is only used by main().
+    """
+    catalog = catalog or get_catalog()
+    snapshot = catalog.snapshot
+    if snapshot is None:
+        print("Failed to read data: activity catalog is not loaded")
+        for _ in profiles:
+            yield pd.DataFrame()
+        return
+
+    profiles = list(profiles)
+    for start in range(0, len(profiles), chunk_size):
+        plans = [
+            prepare_request(snapshot, p.get("interests", []), p.get("languages", []), p.get("time_slots", []),
+                            p.get("budget", 999), p.get("need_free", False), p.get("lat", 0.0), p.get("lon", 0.0),
+                            p.get("sourcetypes", None))
+            for p in profiles[start:start + chunk_size]
+        ]
+        scored = [i for i, plan in enumerate(plans) if plan["interests"] and len(plan["rows"]) > 0]
+
+        similarities = None
+        if scored:
+            # One embedding batch for all interests of the chunk, averaged per user
+            texts = sorted({t for i in scored for t in plans[i]["interests"]})
+            position = {t: j for j, t in enumerate(texts)}
+            vecs = embedding_cache.encode(MODEL, MODEL_NAME, texts, vocabulary=snapshot.interest_vocab)
+            user_matrix = np.stack([vecs[[position[t] for t in plans[i]["interests"]]].mean(axis=0)
+                                    for i in scored])
+            norms = np.linalg.norm(user_matrix, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            # [U, dim] x [dim, N] → similarity of every user to every activity
+            similarities = (user_matrix / norms) @ snapshot.vectors.T
+        row_of = {i: u for u, i in enumerate(scored)}
+
+        for i, plan in enumerate(plans):
+            if not plan["interests"]:
+                yield random_activities(snapshot, plan, top_k)
+            elif i not in row_of:
+                print("No activities match after multi-rule filtering")
+                yield pd.DataFrame()
+            else:
+                similarity = similarities[row_of[i]][plan["rows"]]
+                yield rank_candidates(snapshot, plan, similarity, top_k)
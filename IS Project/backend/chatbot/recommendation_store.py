@@ -0,0 +1,132 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from chatbot.embedding_cache import normalize_text
+
+BASE_DIR = os.path.dirname(__file__)
+STORE_PATH = os.getenv("RECOMMENDATION_STORE",
+                       os.path.join(BASE_DIR, '..', 'data', 'precomputed_recommendations.sqlite'))
+
+# Bumped when the table layout changes; older tables are dropped (the job rebuilds them)
+SCHEMA_VERSION = 2
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recommendations (
+    user_id         TEXT NOT NULL,
+    catalog_version TEXT NOT NULL,
+    profile         TEXT NOT NULL,
+    top_k           INTEGER NOT NULL,
+    results         TEXT NOT NULL,
+    computed_at     REAL NOT NULL,
+    PRIMARY KEY (user_id, catalog_version)
+)
+"""
+
+LIST_FIELDS = ("interests", "languages", "time_slots", "sourcetypes")
+
+
+def _normalized(values) -> List[str]:
+    return sorted(normalize_text(v) for v in values or [])
+
+
+def matches_registration(profile: Dict, registered: Dict, match_location: bool = True) -> bool:
+    """
+    True if a request profile does not contradict the user's registered one.
+
+    Both are canonical profiles (result_cache.canonical_profile). Preferences
+    the request states must equal the registered values (case-insensitive);
+    unstated ones (empty lists, no budget, need_free off) defer to the
+    registration. Stored lists are ranked from the registered home, so a
+    stated location must fall in the same geo cell; pass match_location=False
+    when the location is only a placeholder (the chat flow's random HDB pick).
+    """
+    location = (profile.get("lat") or 0.0, profile.get("lon") or 0.0)
+    if match_location and location != (0.0, 0.0) and location != (registered.get("lat"), registered.get("lon")):
+        return False
+    for field in LIST_FIELDS:
+        if profile.get(field) and _normalized(profile[field]) != _normalized(registered.get(field)):
+            return False
+    if profile.get("budget") and profile["budget"] != registered.get("budget"):
+        return False
+    if profile.get("need_free") and not registered.get("need_free"):
+        return False
+    return True
+
+
+class RecommendationStore:
+    """
+    Precomputed top-K lists keyed by (user id, catalog version), in one SQLite file.
+
+    Each row keeps the canonical registered profile it was computed for, so a
+    lookup only succeeds while the request agrees with that registration.
+    """
+
+    def __init__(self, path: str = STORE_PATH):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._local = threading.local()
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path)
+            if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                with conn:
+                    conn.execute("DROP TABLE IF EXISTS recommendations")
+                    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            conn.execute(SCHEMA)
+            self._local.conn = conn
+        return conn
+
+    def exists(self) -> bool:
+        return os.path.exists(self.path)
+
+    def get(self, user_id: str, catalog_version: str, profile: Dict, top_k: int,
+            match_location: bool = True) -> Optional[List[Dict]]:
+        """
+        Stored top-`top_k` for the user, or None if missing, computed for a smaller
+        top-K or another catalog, or if `profile` (canonical) contradicts the registration.
+        """
+        if not user_id or not self.exists():
+            return None
+        row = self._connect().execute(
+            "SELECT profile, top_k, results FROM recommendations WHERE user_id = ? AND catalog_version = ?",
+            (str(user_id), catalog_version),
+        ).fetchone()
+        if row is None or row[1] < top_k or not matches_registration(profile, json.loads(row[0]), match_location):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return json.loads(row[2])[:top_k]
+
+    def put_many(self, rows: Iterable[Tuple[str, str, Dict, int, List[Dict]]]) -> int:
+        """Insert or replace (user_id, catalog_version, canonical profile, top_k, results) rows in one transaction."""
+        now = time.time()
+        records = [(str(user_id), version, json.dumps(profile), top_k, json.dumps(results), now)
+                   for user_id, version, profile, top_k, results in rows]
+        conn = self._connect()
+        with conn:
+            conn.executemany("INSERT OR REPLACE INTO recommendations VALUES (?, ?, ?, ?, ?, ?)", records)
+        return len(records)
+
+    def prune(self, keep_version: str) -> int:
+        """Drop rows computed against other catalog versions."""
+        conn = self._connect()
+        with conn:
+            return conn.execute("DELETE FROM recommendations WHERE catalog_version != ?", (keep_version,)).rowcount
+
+    def stats(self) -> Dict:
+        total = self.hits + self.misses
+        return {
+            "path": self.path,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+# Process-wide store read by the chat flow and written by data/precompute_recommendations.py
+recommendation_store = RecommendationStore()
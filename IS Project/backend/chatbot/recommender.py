@@ -1,8 +1,12 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Dict, List, Optional
-import math
-from chatbot.recommendation_model import main as rec_main
+from typing import Dict, Iterable, Iterator, List, Optional
+import numpy as np
+import pandas as pd
+from chatbot.recommendation_model import main as rec_main, recommend_many as rec_many
+from chatbot.activity_catalog import ActivityCatalog, get_catalog
+from chatbot.result_cache import canonical_profile, profile_key, result_cache
+from chatbot.recommendation_store import recommendation_store
 
 # Define your own data structure
 @dataclass
@@ -15,17 +19,95 @@ class VitalInput:
     blood_oxygen: int
     timestamp: str  # ISO string
 
+# Response fields: (output key, source column, value used when the column is absent)
+TEXT_FIELDS = [
+    ("activity", "title"), ("description", "description"), ("explanation", "explanation"),
+    ("date", "date"), ("start_time", "start_time"), ("end_time", "end_time"),
+    ("language", "language"), ("source_type", "source_type"),
+]
+NUMBER_FIELDS = [
+    ("score", "score", 0.0), ("score_normalized", "score_normalized", 0.0), ("distance", "distance", -1.0),
+    ("price", "price_num", 0.0), ("lat", "lat", 0.0), ("lon", "lon", 0.0),
+]
+RESULT_KEYS = ["activity", "description", "score", "score_normalized", "explanation", "distance", "price",
+               "date", "start_time", "end_time", "language", "source_type", "lat", "lon"]
+
+
+def to_records(df) -> List[Dict]:
+    """
+    Top-K frame → JSON-safe response dicts, built column by column.
+    Missing text becomes "", non-numeric or non-finite numbers become 0.0.
+    """
+    if df is None or len(df) == 0:
+        return []
+
+    n = len(df)
+    columns = {}
+    for key, col in TEXT_FIELDS:
+        if col not in df.columns:
+            columns[key] = [""] * n
+            continue
+        values = df[col].to_numpy(dtype=object)
+        columns[key] = np.where(pd.isna(values) | (values == ""), "", values)
+    for key, col, absent in NUMBER_FIELDS:
+        if col not in df.columns:
+            columns[key] = np.full(n, absent)
+            continue
+        values = pd.to_numeric(df[col], errors='coerce').to_numpy(dtype=float)
+        columns[key] = np.where(np.isfinite(values), values, 0.0)
+
+    return pd.DataFrame(columns, columns=RESULT_KEYS).to_dict('records')
+
+
 class ElderlyActivityRecommender:
-    def __init__(self, model_path: Optional[str] = None):
+    def __init__(self, model_path: Optional[str] = None, catalog: Optional[ActivityCatalog] = None):
         self.model = None  
+        # Load the activity catalog once at startup; every recommend() call reuses it
+        self.catalog = catalog or get_catalog()
+        self.catalog.load()
+        # Pick up catalogs republished by the data pipeline without a restart
+        self.catalog.start_watcher()
 
-    def recommend(self, profile: Dict, vitals: Optional[VitalInput] = None) -> List[Dict]:
+    def reload_catalog(self) -> bool:
+        """Reload the activity catalog after the data pipeline publishes new files."""
+        return self.catalog.reload()
+
+    def recommend(self, profile: Dict, vitals: Optional[VitalInput] = None, top_k: int = 3,
+                  user_id: Optional[str] = None, location_known: bool = True) -> List[Dict]:
         """
         - profile: Dict - interests, languages, time_slots, budget, need_free, lat, lon, sourcetypes
         - vitals: none
+        - top_k: number of activities to return (e.g. 20 for the map view)
+        - user_id: registered user (data/users.xlsx id); their precomputed list is
+          served unless the profile contradicts their registered preferences or location
+        - location_known: False when lat/lon are a placeholder (the chat flow's random
+          HDB location); the precomputed list is then served wherever it was scored
+
+        return: List[Dict] - recommendation_model Top-K
 
-        return: List[Dict] - recommendation_model Top-5
+        Profiles are canonicalized (sorted interests/languages, budget bucket,
+        location cell) and served from the result cache when possible.
+        Profiles without interests get random activities and are not cached.
         """
+        profile = canonical_profile(profile)
+        if user_id:
+            # Not put in the result cache: the list belongs to this user's registration
+            results = recommendation_store.get(user_id, self.catalog.fingerprint, profile, top_k,
+                                               match_location=location_known)
+            if results is not None:
+                return results
+        if not profile["interests"]:
+            return self._recommend(profile, top_k)
+
+        key = profile_key(profile, top_k)
+        version = self.catalog.version
+        results = result_cache.get(key, version)
+        if results is None:
+            results = self._recommend(profile, top_k)
+            result_cache.put(key, version, results)
+        return results
+
+    def _recommend(self, profile: Dict, top_k: int) -> List[Dict]:
         df = rec_main(
             profile.get("interests", []),
             profile.get("languages", []),
@@ -35,43 +117,37 @@ class ElderlyActivityRecommender:
             profile.get("lat", 0.0),
             profile.get("lon", 0.0),
             profile.get("sourcetypes", None),
+            catalog=self.catalog,
+            top_k=top_k,
         )
-        if df is None or len(df) == 0:
-            return []
-
-        def _safe_float(x, default=0.0):
-            try:
-                f = float(x)
-                return f if math.isfinite(f) else default
-            except Exception:
-                return default
-
-        def _safe_int(x, default=0):
-            try:
-                return int(x)
-            except Exception:
-                return default
-
-        results: List[Dict] = []
-        for _, row in df.iterrows(): 
-            results.append({
-                "activity": row.get("title", "") or "",
-                # "intensity": self._map_intensity(row),
-                "description": row.get("description", "") or "",
-                "score": _safe_float(row.get("score", 0)),
-                "score_normalized": _safe_float(row.get("score_normalized", 0)),
-                "explanation": row.get("explanation", "") or "",
-                "distance": _safe_float(row.get("distance", -1)),
-                "price": _safe_float(row.get("price_num", 0)),
-                "date": row.get("date", "") or "",
-                "start_time": row.get("start_time", "") or "",
-                "end_time": row.get("end_time", "") or "",
-                "language": row.get("language", "") or "",
-                "source_type": row.get("source_type", "") or "",
-                "lat": _safe_float(row.get("lat", 0)),
-                "lon": _safe_float(row.get("lon", 0)),
-            })
-        return results
+        return to_records(df)
+
+    def recommend_many(self, profiles: Iterable[Dict], top_k: int = 3,
+                       user_ids: Optional[List[Optional[str]]] = None) -> Iterator[List[Dict]]:
+        """
+        Recommendations for many profiles, yielded one list per profile in input order.
+        Registered users (user_ids) and cached profiles are answered from the
+        precomputed store / result cache; the rest are scored in batches (one
+        embedding batch and one catalog matmul per chunk).
+        """
+        profiles = [canonical_profile(p) for p in profiles]
+        user_ids = user_ids or [None] * len(profiles)
+        version = self.catalog.version
+        keys = [profile_key(p, top_k) if p["interests"] else None for p in profiles]
+        stored = [recommendation_store.get(u, self.catalog.fingerprint, p, top_k) if u else None
+                  for u, p in zip(user_ids, profiles)]
+        keys = [None if s is not None else k for k, s in zip(keys, stored)]
+        cached = [s if s is not None else (result_cache.get(k, version) if k is not None else None)
+                  for k, s in zip(keys, stored)]
+
+        computed = rec_many([p for p, c in zip(profiles, cached) if c is None],
+                            catalog=self.catalog, top_k=top_k)
+        for key, results in zip(keys, cached):
+            if results is None:
+                results = to_records(next(computed))
+                if key is not None:
+                    result_cache.put(key, version, results)
+            yield results
 
     def _map_intensity(self, row) -> str:
         interest = row.get("InterestScore", 0) or 0
@@ -0,0 +1,122 @@
+import math
+import os
+import threading
+from typing import Dict, List, Optional
+from chatbot.embedding_cache import LRUCache, normalize_text
+
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "1024"))
+GEO_CELL_DECIMALS = int(os.getenv("RESULT_CACHE_GEO_DECIMALS", "3"))   # 3 decimals ≈ 110 m cells
+
+
+def _canonical_list(values) -> List[str]:
+    """De-duplicated (case-insensitive), sorted list; keeps the first spelling of each value."""
+    if isinstance(values, str):
+        values = [values]
+    seen = {}
+    for value in values or []:
+        key = normalize_text(value)
+        if key and key not in seen:
+            seen[key] = str(value).strip()
+    return [seen[k] for k in sorted(seen)]
+
+
+def budget_bucket(budget) -> float:
+    """
+    Budget truncated to the cent; missing or non-positive budgets stay 0 (= not provided).
+    Never rounds up, so an item the user can afford is never scored or explained as over budget.
+    """
+    try:
+        budget = float(budget)
+    except (TypeError, ValueError):
+        return 0.0
+    if not budget > 0:
+        return 0.0
+    if math.isinf(budget):
+        return budget
+    # The small epsilon keeps e.g. 2.3 (stored as 2.2999...) at 2.30
+    return max(1, math.floor(budget * 100 + 1e-6)) / 100
+
+
+def geo_cell(lat, lon) -> tuple:
+    """Quantized location; the cell centre is what gets scored."""
+    return (round(float(lat or 0.0), GEO_CELL_DECIMALS), round(float(lon or 0.0), GEO_CELL_DECIMALS))
+
+
+def canonical_profile(profile: Dict) -> Dict:
+    """
+    Profile reduced to what the recommender reads, in a canonical form.
+    Profiles with the same canonical form get the same recommendations.
+    """
+    lat, lon = geo_cell(profile.get("lat", 0.0), profile.get("lon", 0.0))
+    sourcetypes = profile.get("sourcetypes", None)
+    return {
+        "interests": _canonical_list(profile.get("interests", [])),
+        "languages": _canonical_list(profile.get("languages", [])),
+        "time_slots": _canonical_list(profile.get("time_slots", [])),
+        "budget": budget_bucket(profile.get("budget", 999)),
+        "need_free": bool(profile.get("need_free", False)),
+        "lat": lat,
+        "lon": lon,
+        "sourcetypes": _canonical_list(sourcetypes) if sourcetypes else None,
+    }
+
+
+def profile_key(profile: Dict, top_k: int) -> tuple:
+    """Hashable cache key of a canonical profile."""
+    return (
+        tuple(normalize_text(v) for v in profile["interests"]),
+        tuple(normalize_text(v) for v in profile["languages"]),
+        tuple(normalize_text(v) for v in profile["time_slots"]),
+        profile["budget"],
+        profile["need_free"],
+        profile["lat"],
+        profile["lon"],
+        tuple(normalize_text(v) for v in profile["sourcetypes"]) if profile["sourcetypes"] else None,
+        top_k,
+    )
+
+
+class ResultCache:
+    """
+    Bounded cache of full recommendation lists keyed by canonical profile.
+
+    Entries belong to one catalog version: the first lookup against a newer
+    version drops everything cached for the old catalog.
+    """
+
+    def __init__(self, maxsize: int = RESULT_CACHE_SIZE):
+        self._cache = LRUCache(maxsize)
+        self._version = None
+        self._lock = threading.Lock()
+        self.invalidations = 0
+
+    def _check_version(self, version):
+        with self._lock:
+            if version != self._version:
+                if self._version is not None:
+                    self._cache.clear()
+                    self.invalidations += 1
+                self._version = version
+
+    def get(self, key, version) -> Optional[List[Dict]]:
+        self._check_version(version)
+        results = self._cache.get(key)
+        return None if results is None else [dict(r) for r in results]
+
+    def put(self, key, version, results: List[Dict]):
+        with self._lock:
+            if version != self._version:
+                return  # computed against a catalog that has since been replaced
+        self._cache.put(key, [dict(r) for r in results])
+
+    def clear(self):
+        self._cache.clear()
+
+    def stats(self) -> Dict:
+        stats = self._cache.stats()
+        stats.update({"catalog_version": self._version, "invalidations": self.invalidations})
+        return stats
+
+
+# Process-wide cache in front of ElderlyActivityRecommender.recommend()
+result_cache = ResultCache()
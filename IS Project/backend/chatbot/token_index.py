@@ -0,0 +1,60 @@
+import re
+import numpy as np
+import pandas as pd
+
+TOKEN_RE = re.compile(r'\w+')
+EMPTY = np.empty(0, dtype=np.int64)
+
+
+def tokenize(text: str):
+    return TOKEN_RE.findall(text.lower())
+
+
+class InvertedIndex:
+    """
+    Inverted index over one text column: token and bigram → sorted row ids.
+
+    A phrase lookup returns the rows where the phrase occurs as whole words,
+    the same rows a `\\b<phrase>\\b` regex scan would match. Single words are
+    answered from their posting list alone; multi-word or punctuated phrases
+    intersect the token/bigram postings and verify only those candidate rows.
+    """
+
+    def __init__(self, values):
+        self.texts = ['' if pd.isna(v) else str(v).lower() for v in values]
+
+        postings = {}
+        for row, text in enumerate(self.texts):
+            tokens = tokenize(text)
+            grams = set(tokens)
+            grams.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+            for gram in grams:
+                postings.setdefault(gram, []).append(row)
+        self.postings = {gram: np.array(rows, dtype=np.int64) for gram, rows in postings.items()}
+
+    def __len__(self):
+        return len(self.texts)
+
+    def lookup(self, phrase: str) -> np.ndarray:
+        """Sorted row ids whose text contains `phrase` as whole words."""
+        phrase = phrase.lower().strip()
+        tokens = tokenize(phrase)
+        if not tokens:
+            return EMPTY
+
+        if len(tokens) == 1:
+            keys = tokens
+        else:
+            keys = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        lists = sorted((self.postings.get(k, EMPTY) for k in keys), key=len)
+        rows = lists[0]
+        for other in lists[1:]:
+            if len(rows) == 0:
+                break
+            rows = np.intersect1d(rows, other, assume_unique=True)
+
+        if len(tokens) == 1 and tokens[0] == phrase:
+            return rows
+        # Multi-word or punctuated phrases: verify the (few) candidate rows
+        pattern = re.compile(rf'\b{re.escape(phrase)}\b')
+        return np.array([r for r in rows if pattern.search(self.texts[r])], dtype=np.int64)
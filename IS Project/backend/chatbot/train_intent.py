@@ -1,12 +1,16 @@
-from sentence_transformers import SentenceTransformer
 from sklearn.linear_model import LogisticRegression
 import numpy as np
 import joblib
 import os
+import sys
+
+# Allow running as a script from backend/ or chatbot/
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from chatbot.embedding_runtime import DEFAULT_MODEL_NAME, get_runtime
 
 def main():
     # Use lightweight pretrained model
-    model = SentenceTransformer("all-MiniLM-L6-v2")
+    model = get_runtime(DEFAULT_MODEL_NAME)
 
     # Training examples
     examples = [
@@ -67,7 +71,7 @@ def main():
     # Save both embedding model name and classifier
     output_path = os.path.join(os.path.dirname(__file__), "intent_clf.pkl")
     joblib.dump(
-        {"model_name": "all-MiniLM-L6-v2", "clf": clf},output_path)
+        {"model_name": DEFAULT_MODEL_NAME, "clf": clf},output_path)
     
     print(f"Intent classifier saved to {output_path}")
 
@@ -0,0 +1,30 @@
+"""
+Export the embedding model for the ONNX Runtime backend.
+
+Run from backend/ (needs torch and optimum[onnxruntime]; serving does not):
+    python data/export_onnx.py
+    EMBEDDING_BACKEND=onnx-int8 uvicorn main:app
+
+Writes models/onnx/<model>/ with the fp32 graph, a dynamically quantized
+int8 copy, the tokenizer and the pooling config. Check parity and speed with
+benchmarks/bench_embedding_backend.py before switching backends.
+"""
+import os
+import sys
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from chatbot.embedding_runtime import DEFAULT_MODEL_NAME
+from chatbot.onnx_backend import ONNX_DIR, QUANTIZATION_CONFIG, export_onnx_model
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", default=DEFAULT_MODEL_NAME, help="SentenceTransformer model name or path")
+    parser.add_argument("--out", default=ONNX_DIR, help="export root directory")
+    parser.add_argument("--config", default=QUANTIZATION_CONFIG, help="int8 quantization target (arm64, avx2, avx512, avx512_vnni)")
+    parser.add_argument("--no-int8", action="store_true", help="skip the quantized copy")
+    args = parser.parse_args()
+
+    out_dir = export_onnx_model(args.model, args.out, quantize=not args.no_int8, config=args.config)
+    print(f"ONNX model exported: {out_dir}")
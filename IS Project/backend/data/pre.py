@@ -1,8 +1,24 @@
 import pandas as pd
-from sentence_transformers import SentenceTransformer
+import numpy as np
 import os
+import sys
+import time
+import argparse
 
-MODEL = SentenceTransformer('all-MiniLM-L6-v2')
+# Allow importing the serving bundle writer shared with the backend
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from chatbot.catalog_bundle import BUNDLE_DIR, write_bundle
+from chatbot.interest_vocab import build_interest_vocab
+from chatbot.ann_index import ANN_MIN_ROWS, build_ann_index
+from chatbot.embedding_runtime import get_runtime
+from base.utils import md5
+
+MODEL_NAME = 'all-MiniLM-L6-v2'
+MODEL = get_runtime(MODEL_NAME)
+
+# Vectors of previously embedded activity texts, keyed by md5 of the text
+EMBEDDING_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "activity_embeddings.npz")
+BATCH_SIZE = 64
 
 def enhance_with_keywords(text, keywords, weight=3):
     words = text.split()
@@ -11,7 +27,60 @@ def enhance_with_keywords(text, keywords, weight=3):
             words.extend([keyword] * weight)
     return ' '.join(words)
 
+def load_embedding_cache(path, model_name):
+    """hash -> vector from the previous run; empty if missing or built with another model."""
+    if not os.path.exists(path):
+        return {}
+    with np.load(path, allow_pickle=False) as data:
+        if str(data["model_name"]) != model_name:
+            print(f"Embedding cache was built with {data['model_name']}, ignoring it")
+            return {}
+        return dict(zip(data["hashes"].tolist(), data["vectors"]))
+
+
+def save_embedding_cache(path, model_name, hashes, vectors):
+    with open(path + ".tmp", "wb") as f:
+        np.savez(f, hashes=np.array(hashes), vectors=vectors, model_name=np.array(model_name))
+    os.replace(path + ".tmp", path)
+
+
+def encode_texts(texts, batch_size=BATCH_SIZE, workers=1):
+    """Embed texts in batches, optionally spread over a pool of worker processes."""
+    if workers > 1 and len(texts) > batch_size and hasattr(MODEL.model, "start_multi_process_pool"):
+        model = MODEL.model
+        pool = model.start_multi_process_pool(["cpu"] * workers)
+        try:
+            vectors = model.encode_multi_process(texts, pool, batch_size=batch_size)
+        finally:
+            model.stop_multi_process_pool(pool)
+    else:
+        vectors = MODEL.encode(texts, batch_size=batch_size, show_progress_bar=len(texts) > batch_size)
+    return np.asarray(vectors, dtype=np.float32)
+
+
+def embed_incremental(texts, cache, batch_size=BATCH_SIZE, workers=1):
+    """
+    Vectors for `texts`, reusing cached vectors of unchanged texts (by md5).
+    Returns (vectors, hashes, reused count, computed count).
+    """
+    hashes = [md5(t) for t in texts]
+    missing = sorted({h: i for i, h in enumerate(hashes) if h not in cache}.values())
+    if missing:
+        encoded = encode_texts([texts[i] for i in missing], batch_size, workers)
+        cache = dict(cache)
+        cache.update(zip((hashes[i] for i in missing), encoded))
+    vectors = np.stack([cache[h] for h in hashes]) if hashes else np.empty((0, 0), dtype=np.float32)
+    computed = len(missing)
+    return vectors.astype(np.float32), hashes, len(texts) - computed, computed
+
+
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Embed activities.xlsx and publish the serving bundle")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="texts per encode batch")
+    parser.add_argument("--workers", type=int, default=1, help="encoder processes for new/changed rows")
+    parser.add_argument("--full", action="store_true", help="ignore the embedding cache and re-embed every row")
+    args = parser.parse_args()
+
     base_dir = os.path.dirname(__file__)
     data_path = os.path.join(base_dir, "activities.xlsx")
 
@@ -41,9 +110,30 @@ if __name__ == "__main__":
 
     df["activity_text"] = activity_texts
     print("Starting to generate embeddings...")
-    df["activity_vector"] = list(MODEL.encode(df["activity_text"].tolist(), show_progress_bar=True))
+    start = time.perf_counter()
+    cache = {} if args.full else load_embedding_cache(EMBEDDING_CACHE_PATH, MODEL_NAME)
+    vectors, hashes, reused, computed = embed_incremental(df["activity_text"].tolist(), cache,
+                                                          args.batch_size, args.workers)
+    save_embedding_cache(EMBEDDING_CACHE_PATH, MODEL_NAME, hashes, vectors)
+    print(f"Embeddings: {reused} reused, {computed} computed "
+          f"({reused / max(1, len(df)):.0%} reused) in {time.perf_counter() - start:.1f}s")
+    df["activity_vector"] = list(vectors)
 
     # Save as pickle to speed up subsequent loading
     output_path = os.path.join(base_dir, "activities_with_vec.pkl")
     df.to_pickle(output_path)
     print(f"Save completed: {output_path}")
+
+    # Interest vocabulary table (written before the manifest so the same reload picks it up)
+    categories = pd.concat([df["category"], df["subcategory"]]).dropna().unique()
+    vocab = build_interest_vocab(MODEL, MODEL_NAME, categories, BUNDLE_DIR)
+    print(f"Interest vocabulary written: {vocab['path']} ({vocab['terms']} terms)")
+
+    # ANN index for catalogs large enough to use it (the backend brute-forces smaller ones)
+    if len(df) >= ANN_MIN_ROWS:
+        ann = build_ann_index(vectors, BUNDLE_DIR)
+        print(f"ANN index written: {ann['path']} ({ann['nlist']} lists over {ann['rows']} rows)")
+
+    # Serving bundle: typed columnar metadata + memory-mappable float32 vector matrix
+    manifest = write_bundle(df, vectors, BUNDLE_DIR)
+    print(f"Serving bundle written: {BUNDLE_DIR} ({manifest['rows']} x {manifest['dim']})")
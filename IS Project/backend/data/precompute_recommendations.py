@@ -0,0 +1,112 @@
+"""
+Offline recommendation precompute job.
+
+Run from backend/ (e.g. nightly, after pre.py has published the catalog):
+    python data/precompute_recommendations.py --workers 4
+
+Reads every user in data/users.xlsx, computes their top-K activities in
+parallel chunks, and writes the lists to the SQLite recommendation store keyed
+by user id and catalog version. /chat and /recommend requests carrying a
+user_id are served from the store as long as the request does not contradict
+the user's registered preferences.
+"""
+import os
+import sys
+import time
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from chatbot.recommendation_store import STORE_PATH, RecommendationStore
+from chatbot.result_cache import canonical_profile
+
+USERS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "users.xlsx")
+CHUNK_SIZE = 256
+
+_recommender = None
+
+
+def _clean(value):
+    return None if pd.isna(value) else value
+
+
+def user_profile(row) -> dict:
+    """Recommender profile of one users.xlsx row."""
+    interests = [str(row[c]).strip() for c in row.index if c.startswith("interest") and _clean(row[c]) is not None]
+    languages = str(_clean(row.get("language")) or "").split(",")
+    time_slot = _clean(row.get("preferred_time_slot"))
+    return {
+        "interests": [i for i in interests if i],
+        "languages": [l.strip() for l in languages if l.strip()],
+        "time_slots": [str(time_slot)] if time_slot is not None else [],
+        "budget": _clean(row.get("budget")),
+        "need_free": bool(_clean(row.get("prefer_free")) or False),
+        "lat": _clean(row.get("HDB_Latitude")) or 0.0,
+        "lon": _clean(row.get("HDB_Longitude")) or 0.0,
+    }
+
+
+def _init_worker():
+    global _recommender
+    from chatbot.recommender import ElderlyActivityRecommender
+    _recommender = ElderlyActivityRecommender()
+
+
+def _score_chunk(chunk, top_k):
+    """(catalog version, [(user_id, canonical profile, results)]) for one chunk of (user_id, profile)."""
+    if _recommender is None:
+        _init_worker()
+    if not _recommender.catalog.loaded:
+        raise RuntimeError("activity catalog could not be loaded")
+    catalog_version = _recommender.catalog.fingerprint
+    profiles = [p for _, p in chunk]
+    results = _recommender.recommend_many(profiles, top_k=top_k)
+    rows = [(user_id, canonical_profile(p), recs)
+            for (user_id, p), recs in zip(chunk, results)]
+    return catalog_version, rows
+
+
+def run(users_path, store_path, workers, top_k, chunk_size, keep_old):
+    users = pd.read_excel(users_path)
+    items = [(str(row["id"]), user_profile(row)) for _, row in users.iterrows()]
+    items = [(user_id, p) for user_id, p in items if p["interests"]]  # no interests → random picks, not stored
+    chunks = [items[i:i + chunk_size] for i in range(0, len(items), chunk_size)]
+    print(f"Precomputing top-{top_k} for {len(items)} users ({len(users) - len(items)} without interests skipped) "
+          f"in {len(chunks)} chunks with {workers} worker(s)")
+
+    start = time.perf_counter()
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            outputs = list(pool.map(_score_chunk, chunks, [top_k] * len(chunks)))
+    else:
+        outputs = [_score_chunk(chunk, top_k) for chunk in chunks]
+
+    versions = {version for version, _ in outputs}
+    if len(versions) > 1:
+        print(f"Catalog changed during the run ({len(versions)} versions seen); nothing written, rerun the job")
+        return 1
+    if not outputs:
+        print("No users to precompute")
+        return 0
+    catalog_version = versions.pop()
+
+    store = RecommendationStore(store_path)
+    written = store.put_many((user_id, catalog_version, profile, top_k, recs)
+                             for _, rows in outputs for user_id, profile, recs in rows)
+    pruned = 0 if keep_old else store.prune(catalog_version)
+    print(f"Stored {written} users for catalog {catalog_version} in {store_path} "
+          f"({pruned} stale rows pruned, {time.perf_counter() - start:.1f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", default=USERS_PATH, help="users spreadsheet")
+    parser.add_argument("--store", default=STORE_PATH, help="SQLite store to write")
+    parser.add_argument("--workers", type=int, default=1, help="worker processes (each loads the model)")
+    parser.add_argument("--top-k", type=int, default=20, help="results per user (smaller requests are served by slicing)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE, help="users per batch")
+    parser.add_argument("--keep-old", action="store_true", help="keep rows of older catalog versions")
+    args = parser.parse_args()
+    sys.exit(run(args.users, args.store, args.workers, args.top_k, args.chunk_size, args.keep_old))
@@ -1,13 +1,40 @@
-from fastapi import FastAPI, UploadFile, File
-from pydantic import BaseModel
+import asyncio
+import json
+import os
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Query, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
 from typing import List, Optional
 from fastapi.middleware.cors import CORSMiddleware
-from vital_signs_processor import HealthData, process_vital_signs
-from chatbot.chatbot_service import ChatRequest, ChatResponse, handle_chat
-from chatbot.speech2text_service import recognize_speech
+from chatbot.components import readiness, start_warm_up, timed
+
+# Import cost per component is logged as "[startup] import ..." and reported by /ready
+with timed("import vital_signs_processor"):
+    from vital_signs_processor import HealthData, process_vital_signs
+with timed("import chatbot_service"):
+    from chatbot.chatbot_service import COMPONENTS, ChatRequest, ChatResponse, handle_chat, recommender_component
+with timed("import speech2text_service"):
+    from chatbot.speech2text_service import recognize_speech
 from dotenv import load_dotenv
 
-app = FastAPI()
+# Load the catalog and models in a background thread after startup (0 = on first request only)
+WARM_UP_ON_STARTUP = os.getenv("WARM_UP_ON_STARTUP", "1") == "1"
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # The server accepts connections immediately; /ready turns 200 once warm-up is done
+    if WARM_UP_ON_STARTUP:
+        start_warm_up(COMPONENTS)
+    yield
+    if recommender_component.built:
+        recommender_component.get().catalog.stop_watcher()
+
+
+app = FastAPI(lifespan=lifespan)
 
 origins = [
     "http://localhost",  
@@ -26,6 +53,19 @@ app.add_middleware(
 # Load .env file automatically
 load_dotenv()
 
+@app.get("/health")
+async def health():
+    """Liveness: the process is up and serving requests"""
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+async def ready():
+    """Readiness: 503 until the catalog and models are loaded; per-component status and timings"""
+    report = readiness(COMPONENTS)
+    return JSONResponse(report, status_code=200 if report["ready"] else 503)
+
+
 #Endpoint to process health data
 @app.post("/submit")
 async def submit_data(data: HealthData):
@@ -35,7 +75,9 @@ async def submit_data(data: HealthData):
     return {"status": "processed", "result": result}
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(payload: ChatRequest):
+def chat_endpoint(payload: ChatRequest):
+    # Plain def: FastAPI runs it in the threadpool, so concurrent chats encode
+    # together (micro-batcher) instead of queuing on the event loop
     return handle_chat(payload)
 
 @app.post("/speech_to_text/")
@@ -69,6 +111,38 @@ async def clear_location(payload: ClearLocationRequest):
     return {"status": "success", "message": "Location cleared successfully"}
 
 
+@app.post("/catalog/reload")
+def reload_catalog():
+    """Reload the activity catalog after the data pipeline publishes new files"""
+    from chatbot.chatbot_service import recommender
+
+    if not recommender.reload_catalog():
+        return {"status": "error", "message": "Failed to reload activity catalog"}
+    return {"status": "success", "version": recommender.catalog.version}
+
+
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss counters of the in-process caches, embedding batch-size and queue-wait histograms"""
+    from chatbot.embedding_cache import embedding_cache
+    from chatbot.embedding_runtime import runtime_stats
+    from chatbot.result_cache import result_cache
+
+    return {
+        "embedding": embedding_cache.stats(),
+        "recommendation": result_cache.stats(),
+        "embedding_runtime": runtime_stats(),
+    }
+
+
+@app.get("/intent/stats")
+async def intent_stats():
+    """Chat intent routing: fast-tier vs ML classifier decisions, hit ratio and recent decisions"""
+    from chatbot.intent_router import intent_router
+
+    return intent_router.stats()
+
+
 class RecommendRequest(BaseModel):
     user_interests: List[str]
     user_languages: List[str]
@@ -78,3 +152,64 @@ class RecommendRequest(BaseModel):
     user_lat: float
     user_lon: float
     sourcetypes: Optional[List[str]] = None  # course | event | interest_group
+    user_id: Optional[str] = None  # registered user (data/users.xlsx id), enables precomputed recommendations
+
+    def to_profile(self) -> dict:
+        """Profile dict in the shape ElderlyActivityRecommender.recommend() expects"""
+        return {
+            "interests": self.user_interests,
+            "languages": self.user_languages,
+            "time_slots": self.user_time_slots,
+            "budget": self.user_budget,
+            "need_free": self.user_need_free,
+            "lat": self.user_lat,
+            "lon": self.user_lon,
+            "sourcetypes": self.sourcetypes,
+        }
+
+
+# Latency budget of the structured /recommend endpoint (no LLM on this path)
+RECOMMEND_BUDGET_SECONDS = float(os.getenv("RECOMMEND_BUDGET_SECONDS", "2.0"))
+# Upper bound for top_k (the map view asks for 20); also bounds result-cache key variety
+MAX_TOP_K = 50
+
+
+@app.post("/recommend")
+async def recommend_endpoint(payload: RecommendRequest, top_k: int = Query(3, ge=1, le=MAX_TOP_K)):
+    """Structured recommendations for form-based clients; skips intent and LLM profile parsing"""
+    if not recommender_component.built and recommender_component.error is None and WARM_UP_ON_STARTUP:
+        # Still loading in the warm-up thread: answer now rather than hold the request
+        raise HTTPException(status_code=503, detail="Recommender is warming up", headers={"Retry-After": "5"})
+    # Never build components on the event loop: /health and /ready must keep answering
+    recommender = await run_in_threadpool(recommender_component.get)
+
+    start = time.perf_counter()
+    try:
+        recs = await asyncio.wait_for(
+            run_in_threadpool(recommender.recommend, payload.to_profile(), None, top_k, payload.user_id),
+            timeout=RECOMMEND_BUDGET_SECONDS,
+        )
+    except asyncio.TimeoutError:
+        print(f"[recommend] Exceeded latency budget of {RECOMMEND_BUDGET_SECONDS:.1f}s")
+        raise HTTPException(status_code=504, detail="Recommendation timed out")
+    print(f"[recommend] {len(recs)} results in {(time.perf_counter() - start) * 1000:.1f}ms")
+    return recs
+
+
+class BatchRecommendRequest(BaseModel):
+    items: List[RecommendRequest]
+    top_k: int = Field(3, ge=1, le=MAX_TOP_K)
+
+
+@app.post("/recommend/batch")
+def recommend_batch(payload: BatchRecommendRequest):
+    """Score many profiles in one call; results stream back as one JSON line per item, in order"""
+    from chatbot.chatbot_service import recommender
+
+    def generate():
+        results = recommender.recommend_many([item.to_profile() for item in payload.items], top_k=payload.top_k,
+                                             user_ids=[item.user_id for item in payload.items])
+        for index, recs in enumerate(results):
+            yield json.dumps({"index": index, "result": recs}) + "\n"
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
@@ -0,0 +1,20 @@
+from chatbot.activity_catalog import ActivityCatalog
+from chatbot.recommender import ElderlyActivityRecommender
+
+
+def test_request_path_does_not_reload_after_failed_load(tmp_path, monkeypatch):
+    catalog = ActivityCatalog(activities_path=str(tmp_path / "missing.xlsx"),
+                              vectors_path=str(tmp_path / "missing.pkl"),
+                              bundle_dir=str(tmp_path / "bundle"), poll_interval=0)
+    recommender = ElderlyActivityRecommender(catalog=catalog)  # startup load fails
+    assert not catalog.loaded
+
+    def reload():
+        raise AssertionError("the request path must not reload the catalog")
+
+    monkeypatch.setattr(catalog, "reload", reload)
+    assert catalog.snapshot is None
+    assert catalog.df is None
+    assert catalog.fingerprint == ""
+    profile = {"interests": ["music"], "languages": ["English"], "lat": 1.35, "lon": 103.8}
+    assert recommender.recommend(profile, top_k=3, user_id="42") == []
@@ -0,0 +1,24 @@
+import numpy as np
+import pandas as pd
+from chatbot.bitmask import BitmaskIndex
+
+
+def test_small_vocabulary_uses_one_word():
+    index = BitmaskIndex(pd.Series(["English, Chinese", "Malay", None]), split_pattern=r"[,/]")
+    assert index.masks.ndim == 1
+    assert index.match(["chinese"]).tolist() == [True, False, False]
+    assert index.known().tolist() == [True, True, False]
+
+
+def test_large_vocabulary_spans_several_words():
+    values = [f"lang{i}" for i in range(100)] + [None]
+    index = BitmaskIndex(pd.Series(values))
+    assert index.words == 2
+
+    assert np.flatnonzero(index.match(["LANG99", "lang3"])).tolist() == [3, 99]
+    assert np.flatnonzero(index.match(["lang99"], rows=np.array([0, 99]))).tolist() == [1]
+    assert not index.match(["unknown"]).any()
+    assert index.known().sum() == 100
+
+    table = index.lookup_table(["lang70"], hit=1, miss=0, missing=-1)
+    assert table[index.codes[70]] == 1 and table[index.codes[100]] == -1
@@ -0,0 +1,32 @@
+import shutil
+import numpy as np
+import pandas as pd
+import pytest
+from chatbot.catalog_bundle import bundle_paths, load_bundle, write_bundle
+
+
+def activities(n, title):
+    return pd.DataFrame({"id": [str(i) for i in range(n)], "title": [f"{title} {i}" for i in range(n)],
+                         "lat": np.full(n, 1.35), "lon": np.full(n, 103.8)})
+
+
+def test_bundle_round_trip(tmp_path):
+    vectors = np.random.default_rng(0).standard_normal((5, 8))
+    write_bundle(activities(5, "old"), vectors, str(tmp_path))
+
+    df, loaded, manifest = load_bundle(str(tmp_path))
+    assert df["title"].tolist()[0] == "old 0"
+    assert loaded.shape == (5, 8) and manifest["vectors_md5"]
+
+
+@pytest.mark.parametrize("replaced", [1, 2])  # metadata or vectors file from a newer publish
+def test_half_published_bundle_is_rejected(tmp_path, replaced):
+    old_dir, new_dir = tmp_path / "old", tmp_path / "new"
+    rng = np.random.default_rng(0)
+    write_bundle(activities(5, "old"), rng.standard_normal((5, 8)), str(old_dir))
+    write_bundle(activities(5, "new"), rng.standard_normal((5, 8)), str(new_dir))
+
+    # Same row count and dim: only the checksums can tell the files apart
+    shutil.copy(bundle_paths(str(new_dir))[replaced], bundle_paths(str(old_dir))[replaced])
+    with pytest.raises(ValueError, match="match the manifest"):
+        load_bundle(str(old_dir))
@@ -0,0 +1,33 @@
+from chatbot.components import LazyComponent, readiness
+
+
+class Service:
+    loaded = False
+
+
+def test_built_component_is_not_ready_until_check_passes():
+    component = LazyComponent("service", Service, ready_check=lambda s: s.loaded,
+                              not_ready_reason="catalog is not loaded")
+    assert readiness([component])["components"]["service"]["status"] == "pending"
+
+    service = component.get()
+    report = readiness([component])
+    assert not report["ready"]
+    assert report["components"]["service"]["status"] == "not_ready"
+    assert report["components"]["service"]["error"] == "catalog is not loaded"
+
+    service.loaded = True
+    assert readiness([component])["ready"]
+
+
+def test_failed_build_is_reported():
+    def broken():
+        raise RuntimeError("boom")
+
+    component = LazyComponent("broken", broken)
+    try:
+        component.get()
+    except RuntimeError:
+        pass
+    status = readiness([component])["components"]["broken"]
+    assert status["status"] == "failed" and "boom" in status["error"]
@@ -0,0 +1,33 @@
+import numpy as np
+import pytest
+from chatbot.embedding_batcher import EmbeddingBatcher
+
+
+def fake_encode(calls):
+    def encode(texts):
+        calls.append(list(texts))
+        if "bad" in texts:
+            raise ValueError("cannot encode 'bad'")
+        return np.array([[len(t), 1.0] for t in texts])
+    return encode
+
+
+def test_requests_are_coalesced_into_one_encode():
+    calls = []
+    batcher = EmbeddingBatcher(fake_encode(calls), max_texts=3, max_wait_ms=2000)
+    futures = [batcher.submit(["a"]), batcher.submit(["bb", "ccc"])]
+    assert futures[0].result(timeout=5).tolist() == [[1.0, 1.0]]
+    assert futures[1].result(timeout=5).tolist() == [[2.0, 1.0], [3.0, 1.0]]
+    assert calls == [["a", "bb", "ccc"]]
+
+
+def test_failing_request_does_not_fail_the_rest_of_its_batch():
+    calls = []
+    batcher = EmbeddingBatcher(fake_encode(calls), max_texts=3, max_wait_ms=2000)
+    good, bad, other = batcher.submit(["a"]), batcher.submit(["bad"]), batcher.submit(["cc"])
+
+    assert good.result(timeout=5).tolist() == [[1.0, 1.0]]
+    assert other.result(timeout=5).tolist() == [[2.0, 1.0]]
+    with pytest.raises(ValueError, match="bad"):
+        bad.result(timeout=5)
+    assert calls == [["a", "bad", "cc"], ["a"], ["bad"], ["cc"]]
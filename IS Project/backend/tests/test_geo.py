@@ -0,0 +1,60 @@
+import numpy as np
+from chatbot.geo import SpatialIndex, haversine_distances, to_radians
+
+USER = (1.3521, 103.8198)
+
+
+def catalog_coordinates(seed, rows=300, points=25):
+    """Rows sharing a few points (like community clubs), some without coordinates."""
+    rng = np.random.default_rng(seed)
+    point_lat = 1.25 + rng.random(points) * 0.2
+    point_lon = 103.65 + rng.random(points) * 0.35
+    pick = rng.integers(0, points, rows)
+    lat, lon = point_lat[pick].astype(object), point_lon[pick].astype(object)
+    missing = rng.random(rows) < 0.1
+    lat[missing] = np.nan
+    lon[rng.random(rows) < 0.05] = "n/a"  # invalid values are coerced to NaN
+    return to_radians(lat), to_radians(lon)
+
+
+def brute_force(lat_rad, lon_rad, max_distance):
+    distances = haversine_distances(lat_rad, lon_rad, *USER)
+    rows = np.flatnonzero(distances <= max_distance)
+    return rows, distances[rows]
+
+
+def test_query_radius_matches_haversine_over_all_rows():
+    for seed in range(20):
+        lat_rad, lon_rad = catalog_coordinates(seed)
+        index = SpatialIndex(lat_rad, lon_rad)
+        for max_distance in (0.5, 3.0, 8.0, 50.0):
+            rows, distances = index.query_radius(*USER, max_distance)
+            expected_rows, expected_distances = brute_force(lat_rad, lon_rad, max_distance)
+            assert rows.tolist() == expected_rows.tolist()
+            np.testing.assert_allclose(distances, expected_distances)
+
+
+def test_rows_without_coordinates_are_never_returned():
+    lat_rad, lon_rad = catalog_coordinates(seed=1)
+    index = SpatialIndex(lat_rad, lon_rad)
+    missing = np.isnan(lat_rad) | np.isnan(lon_rad)
+    assert missing.any()
+    assert (index.point_of_row[missing] == -1).all()
+    assert np.isinf(index.distances(*USER)[missing]).all()
+    np.testing.assert_allclose(index.distances(*USER), haversine_distances(lat_rad, lon_rad, *USER))
+
+    rows, _ = index.query_radius(*USER, 1e6)
+    assert rows.tolist() == np.flatnonzero(~missing).tolist()
+
+
+def test_empty_radius_and_empty_index():
+    lat_rad, lon_rad = catalog_coordinates(seed=2)
+    index = SpatialIndex(lat_rad, lon_rad)
+    rows, distances = index.query_radius(0.0, 0.0, 5.0)  # far from every point
+    assert rows.dtype == np.int64 and len(rows) == 0 and len(distances) == 0
+
+    index = SpatialIndex(to_radians([np.nan, None]), to_radians([np.nan, None]))
+    assert len(index) == 0
+    rows, distances = index.query_radius(*USER, 5.0)
+    assert len(rows) == 0 and len(distances) == 0
+    assert np.isinf(index.distances(*USER)).all()
@@ -0,0 +1,51 @@
+import pytest
+from chatbot.intent_router import IntentRouter
+
+CLASSIFIER = "classifier"
+
+
+@pytest.fixture
+def router():
+    return IntentRouter(threshold=0.7)
+
+
+def route(router, text):
+    return router.route(text, fallback=lambda: CLASSIFIER)
+
+
+@pytest.mark.parametrize("text, intent", [
+    ("hello", "chitchat"),
+    ("thank you so much", "chitchat"),
+    ("recommend some exercises", "recommend_activity"),
+    ("recommend activities for my diabetes", "recommend_activity"),  # explicit keywords are a rule
+    ("what is normal blood pressure", "health_qa"),
+    ("i want to go for hiking", "recommend_activity"),
+    ("hi, i want to do yoga", "recommend_activity"),  # a greeting only counts as the whole message
+])
+def test_confident_messages_use_fast_tier(router, text, intent):
+    decision = route(router, text)
+    assert decision.tier == "fast"
+    assert decision.intent == intent
+
+
+@pytest.mark.parametrize("text", [
+    "i want to join a nutrition workshop",  # recommendation vs health term: too close
+    "any cooking class for diabetes patients?",
+    "of course, thanks",  # "course" alone is not a request; "thanks" is not the whole message
+    "tell me a joke",
+    "inactivity is bad",
+])
+def test_unsure_messages_fall_back_to_classifier(router, text):
+    decision = route(router, text)
+    assert decision.tier == "model"
+    assert decision.intent == CLASSIFIER
+
+
+def test_decisions_are_recorded(router):
+    route(router, "hello")
+    route(router, "tell me a joke")
+    stats = router.stats()
+    assert stats["decisions"] == 2
+    assert stats["fast"] == 1 and stats["model"] == 1
+    assert stats["fast_hit_ratio"] == 0.5
+    assert stats["intents"] == {"fast:chitchat": 1, f"model:{CLASSIFIER}": 1}
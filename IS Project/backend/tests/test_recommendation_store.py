@@ -0,0 +1,95 @@
+import pytest
+import chatbot.recommender as recommender_module
+from chatbot.recommendation_store import RecommendationStore, matches_registration
+from chatbot.recommender import ElderlyActivityRecommender
+from chatbot.result_cache import canonical_profile, result_cache
+
+CATALOG_VERSION = "catalog-fingerprint"
+
+# users.xlsx row as data/precompute_recommendations.user_profile() builds it
+REGISTERED = canonical_profile({
+    "interests": ["Tai Chi", "Music"],
+    "languages": ["English"],
+    "time_slots": ["Morning"],
+    "budget": 20,
+    "need_free": False,
+    "lat": 1.3521,
+    "lon": 103.8198,
+})
+STORED = [{"activity": f"Activity {i}", "score": 1.0 - i / 10} for i in range(10)]
+
+
+class FakeCatalog:
+    version = 1
+    fingerprint = CATALOG_VERSION
+
+    def load(self):
+        return True
+
+    def start_watcher(self):
+        pass
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = RecommendationStore(str(tmp_path / "store.sqlite"))
+    store.put_many([("42", CATALOG_VERSION, REGISTERED, len(STORED), STORED)])
+    monkeypatch.setattr(recommender_module, "recommendation_store", store)
+    return store
+
+
+@pytest.fixture
+def recommender(monkeypatch):
+    live = []
+    result_cache.clear()
+    rec = ElderlyActivityRecommender(catalog=FakeCatalog())
+    monkeypatch.setattr(rec, "_recommend", lambda profile, top_k: live.append(profile) or [{"activity": "live"}])
+    rec.live_calls = live
+    return rec
+
+
+def chat_profile(**overrides):
+    # What the chat flow produces: LLM-parsed preferences plus a random HDB location
+    profile = {"interests": ["music", "tai chi"], "languages": ["english"], "time_slots": [],
+               "budget": None, "need_free": False, "lat": 1.3796, "lon": 103.8549}
+    profile.update(overrides)
+    return profile
+
+
+def test_registration_match_ignores_placeholder_location_and_unstated_fields():
+    assert matches_registration(canonical_profile(chat_profile()), REGISTERED, match_location=False)
+    assert matches_registration(canonical_profile(chat_profile(interests=[])), REGISTERED, match_location=False)
+    assert matches_registration(canonical_profile(chat_profile(lat=0.0, lon=0.0)), REGISTERED)
+    assert not matches_registration(canonical_profile(chat_profile(interests=["swimming"])), REGISTERED)
+    assert not matches_registration(canonical_profile(chat_profile(budget=50)), REGISTERED)
+    assert not matches_registration(canonical_profile(chat_profile(need_free=True)), REGISTERED)
+
+
+def test_recommend_serves_registered_user_from_store(store, recommender):
+    # Chat flow: the location is a random placeholder
+    results = recommender.recommend(chat_profile(), top_k=3, user_id="42", location_known=False)
+
+    assert results == STORED[:3]
+    assert recommender.live_calls == []
+    assert store.hits == 1
+
+
+def test_recommend_serves_explicit_registered_location_from_store(store, recommender):
+    results = recommender.recommend(chat_profile(lat=1.35212, lon=103.81978), top_k=3, user_id="42")
+    assert results == STORED[:3]
+
+
+def test_recommend_falls_back_to_live_scoring(store, recommender):
+    live = [{"activity": "live"}]
+    assert recommender.recommend(chat_profile(interests=["swimming"]), top_k=3, user_id="42",
+                                 location_known=False) == live
+    assert recommender.recommend(chat_profile(), top_k=3, user_id="unknown", location_known=False) == live
+    assert recommender.recommend(chat_profile(), top_k=len(STORED) + 1, user_id="42", location_known=False) == live
+    assert store.hits == 0 and store.misses == 3
+
+
+def test_recommend_scores_live_for_explicit_other_location(store, recommender):
+    # /recommend: the client's lat/lon are real inputs, and the stored list is ranked from the registered home
+    assert recommender.recommend(chat_profile(), top_k=3, user_id="42") == [{"activity": "live"}]
+    assert recommender.live_calls[0]["lat"] == 1.38  # scored at the requested cell, not the home
+    assert store.hits == 0 and store.misses == 1
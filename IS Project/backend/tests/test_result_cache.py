@@ -0,0 +1,20 @@
+from chatbot.recommendation_model import explain_recommendation
+from chatbot.result_cache import budget_bucket, canonical_profile
+
+
+def test_budget_is_kept_to_the_cent_and_never_rounded_up():
+    assert budget_bucket(2.5) == 2.5
+    assert budget_bucket(5.5) == 5.5
+    assert budget_bucket(2.3) == 2.3
+    assert budget_bucket(2.399) == 2.39
+    assert budget_bucket("12.345") == 12.34
+    for missing in (None, "n/a", 0, -3, float("nan")):
+        assert budget_bucket(missing) == 0.0
+    assert canonical_profile({"budget": 2.5})["budget"] == 2.5
+
+
+def test_affordable_item_is_not_explained_as_over_budget():
+    row = {"InterestScore": 0.5, "title": "Tai Chi", "description": "", "is_free": 0, "price_num": 2.4,
+           "distance": 1.0, "is_wrong_time_slot": 1}
+    explanation = explain_recommendation(row, ["yoga"], budget_bucket(2.5), False)
+    assert "is within your budget (SGD 2.40)" in explanation
@@ -0,0 +1,78 @@
+import math
+import numpy as np
+import pytest
+from chatbot.recommendation_model import select_top_k, top_positions
+
+THRESHOLD = 0.6
+
+
+def by_score(scores):
+    """sorted() key: score descending, NaN last, ties in row order."""
+    return lambda i: (math.isnan(scores[i]), 0.0 if math.isnan(scores[i]) else -scores[i], i)
+
+
+def reference_top_k(scores, interest, titles, k):
+    """The original sort / concat / drop_duplicates / refill selection, with plain sorted()."""
+    score_order = sorted(range(len(scores)), key=by_score(scores))
+    relevant = [i for i in score_order if interest[i] >= THRESHOLD]
+    others = [i for i in score_order if interest[i] < THRESHOLD]
+    head = (relevant + others)[:k]
+
+    picked, seen = [], set()
+    for i in head:
+        if titles[i] not in seen:
+            seen.add(titles[i])
+            picked.append(i)
+    for i in score_order:
+        if len(picked) >= k:
+            break
+        if titles[i] not in seen:
+            seen.add(titles[i])
+            picked.append(i)
+    return picked
+
+
+def check(scores, interest, titles, k):
+    scores, interest, titles = np.asarray(scores, float), np.asarray(interest, float), np.asarray(titles, object)
+    expected = reference_top_k(scores.tolist(), interest.tolist(), titles.tolist(), k)
+    assert select_top_k(scores, interest, titles, k=k, interest_threshold=THRESHOLD).tolist() == expected
+
+
+def test_top_positions_matches_sorted():
+    key = np.array([0.3, np.nan, 0.9, 0.3, -1.0, 0.9])
+    for count in range(0, 8):
+        assert top_positions(key, count).tolist() == sorted(range(len(key)), key=by_score(key))[:count]
+
+
+def test_relevant_rows_rank_ahead_of_higher_scores():
+    check([0.9, 0.2, 0.5, 0.95], [0.1, 0.8, 0.7, 0.2], ["a", "b", "c", "d"], k=2)
+
+
+def test_fewer_relevant_rows_than_k():
+    check([0.9, 0.2, 0.5, 0.95, 0.1], [0.1, 0.8, 0.1, 0.2, 0.3], ["a", "b", "c", "d", "e"], k=3)
+
+
+def test_duplicate_titles_are_refilled_by_score():
+    check([0.9, 0.8, 0.7, 0.6, 0.95, 0.1], [0.9, 0.9, 0.9, 0.1, 0.1, 0.9],
+          ["same", "same", "same", "x", "y", "z"], k=3)
+
+
+def test_k_at_least_n():
+    check([0.4, 0.1, 0.3], [0.9, 0.1, 0.7], ["a", "b", "a"], k=3)
+    check([0.4, 0.1, 0.3], [0.9, 0.1, 0.7], ["a", "b", "c"], k=10)
+
+
+def test_nan_scores_rank_last_within_their_group():
+    check([np.nan, 0.2, 0.5, np.nan, 0.1], [0.9, 0.9, 0.1, 0.1, 0.1], ["a", "b", "c", "d", "e"], k=4)
+    check([np.nan, np.nan], [0.9, 0.1], ["a", "b"], k=2)
+
+
+@pytest.mark.parametrize("seed", range(200))
+def test_random_catalogs_match_reference(seed):
+    rng = np.random.default_rng(seed)
+    n = int(rng.integers(1, 60))
+    scores = rng.normal(size=n).round(1)  # rounding creates ties
+    scores[rng.random(n) < 0.1] = np.nan
+    interest = rng.random(n)
+    titles = rng.integers(0, max(1, n // 3), size=n).astype(str)  # many duplicate titles
+    check(scores, interest, titles, k=int(rng.integers(1, 12)))